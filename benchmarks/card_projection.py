@@ -0,0 +1,23 @@
+# লিস্ট পেজের পেলোড: পুরো ডকুমেন্ট বনাম CARD_PROJECTION, ২০০ পর্বের সিরিজে
+# mongomock নেটওয়ার্ক দিয়ে BSON পাঠায় না, তাই ফলাফল bson দিয়ে এনকোড করে বাইট আর ডিকোড সময় মাপা হয়
+import argparse
+import bson
+from common import best_ms, load_bot
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--cards", type=int, default=24)
+parser.add_argument("--episodes", type=int, default=200)
+args = parser.parse_args()
+
+bot = load_bot()
+links = [{"quality": quality, "url": f"https://example.com/{quality}"} for quality in ("480p", "720p")]
+bot.movies.insert_many([{
+    "title": f"Series {i}", "type": "series", "poster": f"https://image.tmdb.org/t/p/w500/{i}.jpg", "poster_badge": "", "overview": "An overview. " * 20,
+    "genres": ["Drama"], "episodes": [{"episode_number": e + 1, "title": f"Episode {e + 1}", "overview": "What happens. " * 30, "watch_link": f"https://example.com/{e}", "links": links}
+                                      for e in range(args.episodes)],
+} for i in range(args.cards)])
+
+print(f"{'projection':<16} {'payload':>12} {'decode':>10}")
+for label, projection in (("full document", None), ("CARD_PROJECTION", bot.CARD_PROJECTION)):
+    payload = b"".join(bson.encode(doc) for doc in bot.movies.find({}, projection).limit(args.cards))
+    print(f"{label:<16} {len(payload):>10,} B {best_ms(lambda: bson.decode_all(payload), number=20):>7.2f} ms")
@@ -0,0 +1,44 @@
+# বেঞ্চমার্ক চালাতে: pip install mongomock, তারপর python benchmarks/<name>.py
+# আসল ডাটাবেস ছোঁয়া হয় না: bot.py ইমপোর্টের আগে mongomock এর ইন-মেমরি ক্লায়েন্ট বসানো হয় (tests/conftest.py এর মতো)
+import os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_bot():
+    import mongomock, pymongo
+    os.environ["MONGO_URI"] = "mongodb://localhost/benchmark"
+    os.environ.setdefault("TMDB_API_KEY", "")
+    pymongo.MongoClient = mongomock.MongoClient
+    import bot
+    return bot
+
+
+def seed(bot, count, episodes=0):
+    docs = []
+    for i in range(count):
+        docs.append({
+            "title": f"Movie {i}", "type": "series" if i % 3 == 0 else "movie", "is_trending": i % 2 == 0, "is_coming_soon": i % 7 == 0,
+            "poster": f"https://image.tmdb.org/t/p/w500/{i}.jpg", "overview": "An overview of a title. " * 8, "poster_badge": "4K" if i % 5 == 0 else "",
+            "genres": ["Action"] if i % 2 else ["Drama", "Action"], "release_date": f"20{10 + i % 10}-01-01", "watch_link": "https://example.com/watch",
+            "episodes": [{"episode_number": e + 1, "title": f"Episode {e + 1}", "watch_link": "https://example.com/e"} for e in range(episodes)] if i % 3 == 0 else None,
+        })
+    bot.movies.insert_many(docs)
+    return docs
+
+
+# একটা ফাংশন কয়েকবার চালিয়ে সবচেয়ে ভালো গড় (মিলিসেকেন্ডে)
+def best_ms(fn, number=100, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number): fn()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best * 1000
+
+
+def with_latency(method, seconds):
+    def slow(*args, **kwargs):
+        time.sleep(seconds)
+        return method(*args, **kwargs)
+    return slow
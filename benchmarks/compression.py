@@ -0,0 +1,30 @@
+# রুট প্রতি কমপ্রেশন: আসল বাইট, gzip (GZIP_LEVEL) ও brotli (BROTLI_QUALITY) এর বাইট আর প্রতি কমপ্রেশনে CPU সময়
+# ক্যাশ করা পেজে প্রতিটি এনকোডিং একবারই কমপ্রেস হয় (encoded_response), তাই এই সময় শুধু ক্যাশ মিসে লাগে
+import argparse
+from common import best_ms, load_bot, seed
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--titles", type=int, default=60)
+args = parser.parse_args()
+
+bot = load_bot()
+seed(bot, args.titles, episodes=10)
+client = bot.app.test_client()
+movie_id, series_id = (str(bot.movies.find_one({"type": kind})["_id"]) for kind in ("movie", "series"))
+routes = ["/", f"/movie/{movie_id}", f"/movie/{series_id}", "/movies_only", "/genres", "/contact", "/api/list/movies", "/api/search?q=movie",
+          "/api/v1/lists/trending", f"/api/v1/titles/{series_id}/episodes", f"/assets/{bot.asset_names['index.css']}", f"/assets/{bot.asset_names['index.js']}"]
+encodings = ["gzip", "br"] if bot.brotli else ["gzip"]
+if not bot.brotli: print("brotli is not installed; showing gzip only")
+
+print(f"{'route':<40} {'bytes':>8}" + "".join(f" {enc + ' bytes':>11} {'ms':>7}" for enc in encodings))
+totals = dict.fromkeys(["identity", *encodings], 0)
+for route in routes:
+    body = client.get(route, headers={"Accept-Encoding": "identity"}).data
+    row = f"{route[:40]:<40} {len(body):>8}"
+    totals["identity"] += len(body)
+    for enc in encodings:
+        compressed = bot.compress(body, enc)
+        totals[enc] += len(compressed)
+        row += f" {len(compressed):>11} {best_ms(lambda: bot.compress(body, enc), number=50):>7.3f}"
+    print(row)
+print(f"{'total':<40} {totals['identity']:>8}" + "".join(f" {totals[enc]:>11} {'':>7}" for enc in encodings))
@@ -0,0 +1,20 @@
+# টেমপ্লেট রেন্ডার: প্রতি রিকোয়েস্টে স্ট্রিং থেকে কম্পাইল (render_template_string, আগের পদ্ধতি) বনাম DictLoader এ একবার কম্পাইল করা render_template
+import argparse
+from bson import ObjectId
+from flask import render_template, render_template_string
+from common import best_ms, load_bot
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--cards", type=int, nargs="+", default=[12, 500])
+args = parser.parse_args()
+
+bot = load_bot()
+print(f"{'cards':>6} {'compile each time':>18} {'precompiled':>12}")
+with bot.app.test_request_context("/movies_only"):
+    for count in args.cards:
+        cards = [{"_id": ObjectId(), "title": f"Movie {i}", "poster": f"https://image.tmdb.org/t/p/w500/{i}.jpg", "poster_badge": "4K" if i % 5 == 0 else ""} for i in range(count)]
+        context = {"movies": cards, "query": "All Movies", "is_full_page_list": True}
+        assert render_template_string(bot.TEMPLATES["index.html"], **context) == render_template("index.html", **context)
+        string_ms = best_ms(lambda: render_template_string(bot.TEMPLATES["index.html"], **context), number=20)
+        compiled_ms = best_ms(lambda: render_template("index.html", **context), number=20)
+        print(f"{count:>6} {string_ms:>15.2f} ms {compiled_ms:>9.2f} ms")
@@ -1,19 +1,45 @@
-from flask import Flask, render_template_string, request, redirect, url_for, Response
-from pymongo import MongoClient
+from flask import Flask, render_template, request, redirect, url_for, Response, g, jsonify, stream_with_context
+from pymongo import MongoClient, UpdateOne, ReplaceOne, IndexModel, ReturnDocument, ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError, BulkWriteError
+from jinja2 import DictLoader, FileSystemBytecodeCache
 from bson.objectid import ObjectId
-import requests, os
+import requests, os, sys, argparse, atexit, csv, io, json, hashlib, gzip, threading, time, bisect, heapq, unicodedata, queue
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.http import is_resource_modified
 from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timedelta
+from urllib.parse import urlencode, quote
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+# নিচের তিনটি requirements.txt এ আছে; কোনোটা ইমপোর্ট না হলে অ্যাপ চলে, তবে ধীর পথে (সতর্কবার্তা সহ)
+try: import brotli
+except ImportError:
+    brotli = None
+    print("Warning: brotli is not installed. Responses will only be gzip-compressed.")
+try: import orjson # /api/v1 এর দ্রুত JSON এনকোডার
+except ImportError:
+    orjson = None
+    print("Warning: orjson is not installed. /api/v1 will use the slower json module.")
+try: from PIL import Image
+except ImportError:
+    Image = None
+    print("Warning: Pillow is not installed. Posters will be served at their original size.")
 
 # .env ফাইল থেকে এনভায়রনমেন্ট ভেরিয়েবল লোড করুন
 load_dotenv()
 
 app = Flask(__name__)
+# রিভার্স প্রক্সির পেছনে থাকলে TRUSTED_PROXIES=প্রক্সির সংখ্যা (procfile এ রাউটারের জন্য 1 দেওয়া আছে); ডিফল্ট 0 এ ক্লায়েন্টের পাঠানো X-Forwarded-For বিশ্বাস করা হয় না
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.getenv("TRUSTED_PROXIES", 0)))
 
 # Environment variables
 MONGO_URI = os.getenv("MONGO_URI")
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
+TMDB_BASE_URL = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3")
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "password")
 
@@ -51,17 +77,61 @@ try:
     movies = db["movies"]
     settings = db["settings"]
     feedback = db["feedback"]
+    tmdb_cache = db["tmdb_cache"]
+    facets = db["facets"]
+    meta = db["meta"]
     print("Successfully connected to MongoDB!")
 except Exception as e:
     print(f"Error connecting to MongoDB: {e}. Exiting.")
     exit(1)
 
+# --- ইনডেক্স: প্রতিটি রুটের ফিল্টার + sort('_id', -1) এর জন্য কম্পাউন্ড ইনডেক্স; create_indexes একই স্পেকে কিছুই করে না ---
+# যাচাই করতে: python bot.py check-indexes (explain() এ COLLSCAN বা মেমোরিতে SORT হলে জানায়)
+INDEXES = {
+    movies: [
+        IndexModel([("is_trending", ASCENDING), ("_id", DESCENDING)]),
+        IndexModel([("type", ASCENDING), ("_id", DESCENDING)]),
+        IndexModel([("is_coming_soon", ASCENDING), ("_id", DESCENDING)]),
+        IndexModel([("genres", ASCENDING), ("_id", DESCENDING)]),
+        IndexModel([("poster_badge", ASCENDING), ("_id", DESCENDING)]),
+        IndexModel([("related._id", ASCENDING)]),
+        IndexModel([("title", ASCENDING), ("type", ASCENDING)]) # বাল্ক ইমপোর্টের upsert কী
+    ],
+    feedback: [IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING)])],
+    tmdb_cache: [IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)], # মেয়াদ শেষ হলে Mongo নিজেই মুছে দেয়
+    facets: [IndexModel([("kind", ASCENDING), ("name", ASCENDING)])]
+}
+
+def ensure_indexes():
+    for collection, indexes in INDEXES.items():
+        try: collection.create_indexes(indexes)
+        except PyMongoError as e: print(f"Warning: could not create indexes on '{collection.name}': {e}")
+
+ensure_indexes()
+
 
 # === Context Processor: সমস্ত টেমপ্লেটে বিজ্ঞাপনের কোড সহজলভ্য করার জন্য ===
+# বিজ্ঞাপনের সেটিংস প্রসেসের মেমোরিতে রাখা হয়; AD_SETTINGS_TTL সেকেন্ড পরপর শুধু version ফিল্ড মিলিয়ে দেখা হয়,
+# যাতে অন্য gunicorn worker এ save_ads চললেও এখানে নতুন কোড পৌঁছে যায়
+AD_SETTINGS_TTL = int(os.getenv("AD_SETTINGS_TTL", 30))
+ad_settings_cache = {"doc": None, "checked_at": 0}
+
+def get_ad_settings(refresh=False):
+    now, cached = time.monotonic(), ad_settings_cache["doc"]
+    if cached is not None and not refresh:
+        if now - ad_settings_cache["checked_at"] < AD_SETTINGS_TTL: return cached
+        latest = settings.find_one({}, {"version": 1}) or {}
+        if latest.get("version") == cached.get("version"):
+            ad_settings_cache["checked_at"] = now
+            return cached
+        clear_page_cache() # ক্যাশ করা পেজে পুরনো বিজ্ঞাপন রয়ে গেছে
+    ad_codes = settings.find_one() or {}
+    ad_settings_cache.update(doc=ad_codes, checked_at=now)
+    return ad_codes
+
 @app.context_processor
 def inject_ads():
-    ad_codes = settings.find_one()
-    return dict(ad_settings=(ad_codes or {}))
+    return dict(ad_settings=get_ad_settings())
 
 
 # --- START OF index_html TEMPLATE ---
@@ -72,7 +142,106 @@ index_html = """
 <meta charset="UTF-8" />
 <meta name="viewport" content="width=device-width, initial-scale=1.0, user-scalable=no" />
 <title>MovieZone - Your Entertainment Hub</title>
-<style>
+<link rel="stylesheet" href="{{ asset_url('index.css') }}">
+<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.2.0/css/all.min.css">
+</head>
+<body>
+<header class="main-nav">
+  <a href="{{ url_for('home') }}" class="logo">MovieZone</a>
+  <form method="GET" action="/" class="search-form" data-suggest="{{ url_for('suggest') }}">
+    <input type="search" name="q" class="search-input" placeholder="Search..." value="{{ query|default('') }}" autocomplete="off" />
+    <div class="suggest-box"></div>
+  </form>
+</header>
+
+<main>
+  {% from "card_macros.html" import render_movie_card %}
+
+  {% if is_full_page_list %}
+    <div class="full-page-grid-container">
+      <h2 class="full-page-grid-title">{{ query }}</h2>
+      {% if movies|length == 0 %}<p style="text-align:center; color: var(--text-dark); margin-top: 40px;">No content found.</p>
+      {% else %}<div class="full-page-grid">{% for m in movies %}{{ render_movie_card(m) }}{% endfor %}</div>{% endif %}
+      {% if next_page_url %}<a href="{{ next_page_url }}" class="load-more" data-fragment="{{ next_fragment_url }}">Load More</a>{% endif %}
+    </div>
+  {% else %}
+    {% if all_badges %}
+    <div class="tags-section">
+        <div class="tags-container">
+            {% for badge in all_badges %}<a href="{{ url_for('movies_by_badge', badge_name=badge) }}" class="tag-link">{{ badge }}</a>{% endfor %}
+        </div>
+    </div>
+    {% endif %}
+    {% if recently_added %}
+      <div class="hero-section">
+        {% for movie in recently_added %}
+          <div class="hero-slide {% if loop.first %}active{% endif %}" style="background-image: url('{{ poster_url(movie, 'w500') }}');">
+            <div class="hero-content">
+              <h1 class="hero-title">{{ movie.title }}</h1>
+              <p class="hero-overview">{{ movie.overview }}</p>
+              <div class="hero-buttons">
+                 {% if movie.watch_link and not movie.is_coming_soon %}<a href="{{ url_for('watch_movie', movie_id=movie._id) }}" class="btn btn-primary"><i class="fas fa-play"></i> Watch Now</a>{% endif %}
+                <a href="{{ url_for('movie_detail', movie_id=movie._id) }}" class="btn btn-secondary"><i class="fas fa-info-circle"></i> More Info</a>
+              </div>
+            </div>
+          </div>
+        {% endfor %}
+      </div>
+    {% endif %}
+
+    {% macro render_carousel(title, movies_list, endpoint) %}
+      {% if movies_list %}
+      <div class="carousel-row">
+        <div class="carousel-header">
+          <h2 class="carousel-title">{{ title }}</h2>
+          <a href="{{ url_for(endpoint) }}" class="see-all-link">See All ></a>
+        </div>
+        <div class="carousel-wrapper">
+          <div class="carousel-content">{% for m in movies_list %}{{ render_movie_card(m) }}{% endfor %}</div>
+          <button class="carousel-arrow prev"><i class="fas fa-chevron-left"></i></button>
+          <button class="carousel-arrow next"><i class="fas fa-chevron-right"></i></button>
+        </div>
+      </div>
+      {% endif %}
+    {% endmacro %}
+    
+    {{ render_carousel('Trending Now', trending_movies, 'trending_movies') }}
+    {% if ad_settings.banner_ad_code %}<div class="ad-container">{{ ad_settings.banner_ad_code|safe }}</div>{% endif %}
+    {{ render_carousel('Latest Movies', latest_movies, 'movies_only') }}
+    {% if ad_settings.native_banner_code %}<div class="ad-container">{{ ad_settings.native_banner_code|safe }}</div>{% endif %}
+    {{ render_carousel('Web Series', latest_series, 'webseries') }}
+    {{ render_carousel('Recently Added', recently_added_full, 'recently_added_all') }}
+    {{ render_carousel('Coming Soon', coming_soon_movies, 'coming_soon') }}
+    
+    <div class="telegram-join-section">
+        <i class="fa-brands fa-telegram telegram-icon"></i>
+        <h2>Join Our Telegram Channel</h2>
+        <p>Get the latest movie updates, news, and direct download links right on your phone!</p>
+        <a href="https://t.me/+60goZWp-FpkxNzVl" target="_blank" class="telegram-join-button">
+            <i class="fa-brands fa-telegram"></i> Join Main Channel
+        </a>
+    </div>
+  {% endif %}
+</main>
+
+<nav class="bottom-nav">
+  <a href="{{ url_for('home') }}" class="nav-item {% if request.endpoint == 'home' %}active{% endif %}"><i class="fas fa-home"></i><span>Home</span></a>
+  <a href="{{ url_for('genres_page') }}" class="nav-item {% if request.endpoint == 'genres_page' %}active{% endif %}"><i class="fas fa-layer-group"></i><span>Genres</span></a>
+  <a href="{{ url_for('movies_only') }}" class="nav-item {% if request.endpoint == 'movies_only' %}active{% endif %}"><i class="fas fa-film"></i><span>Movies</span></a>
+  <a href="{{ url_for('webseries') }}" class="nav-item {% if request.endpoint == 'webseries' %}active{% endif %}"><i class="fas fa-tv"></i><span>Series</span></a>
+  <a href="{{ url_for('contact') }}" class="nav-item {% if request.endpoint == 'contact' %}active{% endif %}"><i class="fas fa-envelope"></i><span>Request</span></a>
+</nav>
+
+<script src="{{ asset_url('index.js') }}"></script>
+{% if ad_settings.popunder_code %}{{ ad_settings.popunder_code|safe }}{% endif %}
+{% if ad_settings.social_bar_code %}{{ ad_settings.social_bar_code|safe }}{% endif %}
+</body>
+</html>
+"""
+# --- END OF index_html TEMPLATE ---
+
+# --- START OF index_css ASSET ---
+index_css = """
   @import url('https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Roboto:wght@400;500;700&display=swap');
   :root {
       --netflix-red: #E50914; --netflix-black: #141414;
@@ -107,6 +276,15 @@ index_html = """
       transition: width 0.3s ease, background-color 0.3s ease; width: 250px;
   }
   .search-input:focus { background-color: rgba(0,0,0,0.9); border-color: var(--text-light); outline: none; }
+  .search-form { position: relative; }
+  .suggest-box {
+      display: none; position: absolute; top: 100%; right: 0; width: 100%; min-width: 250px; margin-top: 4px;
+      background-color: rgba(20,20,20,0.97); border: 1px solid #444; border-radius: 4px; overflow: hidden;
+  }
+  .suggest-box.open { display: block; }
+  .suggest-item { display: flex; align-items: center; gap: 10px; padding: 6px 10px; font-size: 0.9rem; }
+  .suggest-item:hover, .suggest-item.active { background-color: var(--netflix-red); }
+  .suggest-item img { width: 32px; height: 48px; object-fit: cover; border-radius: 2px; background-color: #333; flex-shrink: 0; }
 
   .tags-section {
     padding: 80px 50px 20px 50px;
@@ -221,6 +399,11 @@ index_html = """
       display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); gap: 15px;
   }
   .full-page-grid .movie-card { min-width: 0; }
+  .load-more {
+      display: block; width: 200px; margin: 30px auto 0 auto; padding: 10px 20px; text-align: center;
+      background-color: rgba(109, 109, 110, 0.7); border-radius: 4px; font-weight: 700;
+  }
+  .load-more:hover { background-color: var(--netflix-red); }
   
   .bottom-nav {
       display: none; position: fixed; bottom: 0; left: 0; right: 0;
@@ -288,101 +471,11 @@ index_html = """
       .telegram-join-section h2 { font-size: 2rem; }
       .telegram-join-section p { font-size: 1rem; }
   }
-</style>
-<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.2.0/css/all.min.css">
-</head>
-<body>
-<header class="main-nav">
-  <a href="{{ url_for('home') }}" class="logo">MovieZone</a>
-  <form method="GET" action="/" class="search-form">
-    <input type="search" name="q" class="search-input" placeholder="Search..." value="{{ query|default('') }}" />
-  </form>
-</header>
-
-<main>
-  {% macro render_movie_card(m) %}
-    <a href="{{ url_for('movie_detail', movie_id=m._id) }}" class="movie-card">
-      {% if m.poster_badge %}<div class="poster-badge">{{ m.poster_badge }}</div>{% endif %}
-      <img class="movie-poster" loading="lazy" src="{{ m.poster or 'https://via.placeholder.com/400x600.png?text=No+Image' }}" alt="{{ m.title }}">
-      <div class="card-info-overlay"><h4 class="card-info-title">{{ m.title }}</h4></div>
-    </a>
-  {% endmacro %}
-
-  {% if is_full_page_list %}
-    <div class="full-page-grid-container">
-      <h2 class="full-page-grid-title">{{ query }}</h2>
-      {% if movies|length == 0 %}<p style="text-align:center; color: var(--text-dark); margin-top: 40px;">No content found.</p>
-      {% else %}<div class="full-page-grid">{% for m in movies %}{{ render_movie_card(m) }}{% endfor %}</div>{% endif %}
-    </div>
-  {% else %}
-    {% if all_badges %}
-    <div class="tags-section">
-        <div class="tags-container">
-            {% for badge in all_badges %}<a href="{{ url_for('movies_by_badge', badge_name=badge) }}" class="tag-link">{{ badge }}</a>{% endfor %}
-        </div>
-    </div>
-    {% endif %}
-    {% if recently_added %}
-      <div class="hero-section">
-        {% for movie in recently_added %}
-          <div class="hero-slide {% if loop.first %}active{% endif %}" style="background-image: url('{{ movie.poster or '' }}');">
-            <div class="hero-content">
-              <h1 class="hero-title">{{ movie.title }}</h1>
-              <p class="hero-overview">{{ movie.overview }}</p>
-              <div class="hero-buttons">
-                 {% if movie.watch_link and not movie.is_coming_soon %}<a href="{{ url_for('watch_movie', movie_id=movie._id) }}" class="btn btn-primary"><i class="fas fa-play"></i> Watch Now</a>{% endif %}
-                <a href="{{ url_for('movie_detail', movie_id=movie._id) }}" class="btn btn-secondary"><i class="fas fa-info-circle"></i> More Info</a>
-              </div>
-            </div>
-          </div>
-        {% endfor %}
-      </div>
-    {% endif %}
-
-    {% macro render_carousel(title, movies_list, endpoint) %}
-      {% if movies_list %}
-      <div class="carousel-row">
-        <div class="carousel-header">
-          <h2 class="carousel-title">{{ title }}</h2>
-          <a href="{{ url_for(endpoint) }}" class="see-all-link">See All ></a>
-        </div>
-        <div class="carousel-wrapper">
-          <div class="carousel-content">{% for m in movies_list %}{{ render_movie_card(m) }}{% endfor %}</div>
-          <button class="carousel-arrow prev"><i class="fas fa-chevron-left"></i></button>
-          <button class="carousel-arrow next"><i class="fas fa-chevron-right"></i></button>
-        </div>
-      </div>
-      {% endif %}
-    {% endmacro %}
-    
-    {{ render_carousel('Trending Now', trending_movies, 'trending_movies') }}
-    {% if ad_settings.banner_ad_code %}<div class="ad-container">{{ ad_settings.banner_ad_code|safe }}</div>{% endif %}
-    {{ render_carousel('Latest Movies', latest_movies, 'movies_only') }}
-    {% if ad_settings.native_banner_code %}<div class="ad-container">{{ ad_settings.native_banner_code|safe }}</div>{% endif %}
-    {{ render_carousel('Web Series', latest_series, 'webseries') }}
-    {{ render_carousel('Recently Added', recently_added_full, 'recently_added_all') }}
-    {{ render_carousel('Coming Soon', coming_soon_movies, 'coming_soon') }}
-    
-    <div class="telegram-join-section">
-        <i class="fa-brands fa-telegram telegram-icon"></i>
-        <h2>Join Our Telegram Channel</h2>
-        <p>Get the latest movie updates, news, and direct download links right on your phone!</p>
-        <a href="https://t.me/+60goZWp-FpkxNzVl" target="_blank" class="telegram-join-button">
-            <i class="fa-brands fa-telegram"></i> Join Main Channel
-        </a>
-    </div>
-  {% endif %}
-</main>
-
-<nav class="bottom-nav">
-  <a href="{{ url_for('home') }}" class="nav-item {% if request.endpoint == 'home' %}active{% endif %}"><i class="fas fa-home"></i><span>Home</span></a>
-  <a href="{{ url_for('genres_page') }}" class="nav-item {% if request.endpoint == 'genres_page' %}active{% endif %}"><i class="fas fa-layer-group"></i><span>Genres</span></a>
-  <a href="{{ url_for('movies_only') }}" class="nav-item {% if request.endpoint == 'movies_only' %}active{% endif %}"><i class="fas fa-film"></i><span>Movies</span></a>
-  <a href="{{ url_for('webseries') }}" class="nav-item {% if request.endpoint == 'webseries' %}active{% endif %}"><i class="fas fa-tv"></i><span>Series</span></a>
-  <a href="{{ url_for('contact') }}" class="nav-item {% if request.endpoint == 'contact' %}active{% endif %}"><i class="fas fa-envelope"></i><span>Request</span></a>
-</nav>
+"""
+# --- END OF index_css ASSET ---
 
-<script>
+# --- START OF index_js ASSET ---
+index_js = """
     const nav = document.querySelector('.main-nav');
     window.addEventListener('scroll', () => { window.scrollY > 50 ? nav.classList.add('scrolled') : nav.classList.remove('scrolled'); });
     document.querySelectorAll('.carousel-arrow').forEach(button => {
@@ -400,13 +493,72 @@ index_html = """
             setInterval(() => { currentSlide = (currentSlide + 1) % slides.length; showSlide(currentSlide); }, 5000);
         }
     });
-</script>
-{% if ad_settings.popunder_code %}{{ ad_settings.popunder_code|safe }}{% endif %}
-{% if ad_settings.social_bar_code %}{{ ad_settings.social_bar_code|safe }}{% endif %}
-</body>
-</html>
+    const searchInput = document.querySelector('.search-input'), suggestBox = document.querySelector('.suggest-box');
+    let suggestTimer, suggestSeq = 0;
+    searchInput.addEventListener('input', () => {
+        clearTimeout(suggestTimer);
+        const q = searchInput.value.trim();
+        if (!q) { suggestBox.classList.remove('open'); return; }
+        suggestTimer = setTimeout(() => {
+            const seq = ++suggestSeq;
+            fetch(searchInput.closest('form').dataset.suggest + '?q=' + encodeURIComponent(q)).then(r => r.json()).then(data => {
+                if (seq !== suggestSeq) return;
+                suggestBox.innerHTML = '';
+                data.results.forEach(m => {
+                    const a = document.createElement('a'), img = document.createElement('img'), span = document.createElement('span');
+                    a.className = 'suggest-item'; a.href = m.url;
+                    img.src = m.poster || ''; img.alt = ''; img.loading = 'lazy';
+                    span.textContent = m.title;
+                    a.append(img, span); suggestBox.appendChild(a);
+                });
+                suggestBox.classList.toggle('open', data.results.length > 0);
+            }).catch(() => {});
+        }, 120);
+    });
+    document.addEventListener('click', (e) => { if (!e.target.closest('.search-form')) suggestBox.classList.remove('open'); });
+    const loadMore = document.querySelector('.load-more');
+    if (loadMore) {
+        const grid = document.querySelector('.full-page-grid');
+        let loading = false;
+        const loadNext = (e) => {
+            if (e) e.preventDefault();
+            if (loading || !loadMore.isConnected) return;
+            loading = true;
+            fetch(loadMore.dataset.fragment).then(r => r.json()).then(data => {
+                grid.insertAdjacentHTML('beforeend', data.html);
+                if (data.next) loadMore.dataset.fragment = data.next; else loadMore.remove();
+                loading = false;
+            }).catch(() => { loading = false; });
+        };
+        loadMore.addEventListener('click', loadNext);
+        if ('IntersectionObserver' in window) new IntersectionObserver(entries => { if (entries[0].isIntersecting) loadNext(); }, { rootMargin: '600px' }).observe(loadMore);
+    }
 """
-# --- END OF index_html TEMPLATE ---
+# --- END OF index_js ASSET ---
+
+
+# --- START OF card_macros_html TEMPLATE ---
+card_macros_html = """
+{% macro render_movie_card(m) %}
+    <a href="{{ url_for('movie_detail', movie_id=m._id) }}" class="movie-card">
+      {% if m.poster_badge %}<div class="poster-badge">{{ m.poster_badge }}</div>{% endif %}
+      <img class="movie-poster" loading="lazy" src="{{ poster_url(m, 'w342') }}" srcset="{{ poster_srcset(m) }}" sizes="(max-width: 768px) 34vw, 240px" alt="{{ m.title }}">
+      <div class="card-info-overlay"><h4 class="card-info-title">{{ m.title }}</h4></div>
+    </a>
+{% endmacro %}
+"""
+# --- END OF card_macros_html TEMPLATE ---
+
+# --- START OF poster_placeholder_svg ASSET ---
+poster_placeholder_svg = """
+<svg xmlns="http://www.w3.org/2000/svg" width="400" height="600" viewBox="0 0 400 600"><rect width="400" height="600" fill="#222"/><text x="200" y="300" fill="#a0a0a0" font-family="Roboto, Arial, sans-serif" font-size="32" text-anchor="middle">No Image</text></svg>
+"""
+# --- END OF poster_placeholder_svg ASSET ---
+
+
+# --- START OF cards_html TEMPLATE (infinite scroll fragment) ---
+cards_html = """{% from "card_macros.html" import render_movie_card %}{% for m in movies %}{{ render_movie_card(m) }}{% endfor %}"""
+# --- END OF cards_html TEMPLATE ---
 
 
 # --- START OF genres_html TEMPLATE ---
@@ -417,7 +569,31 @@ genres_html = """
 <meta charset="UTF-8" />
 <meta name="viewport" content="width=device-width, initial-scale=1.0, user-scalable=no" />
 <title>{{ title }} - MovieZone</title>
-<style>
+<link rel="stylesheet" href="{{ asset_url('genres.css') }}">
+<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.2.0/css/all.min.css">
+</head>
+<body>
+  <div class="main-container">
+    <a href="{{ url_for('home') }}" class="back-button"><i class="fas fa-arrow-left"></i> Back to Home</a>
+    <h1 class="page-title">{{ title }}</h1>
+    <div class="genre-grid">
+      {% for genre in genres %}
+        <a href="{{ url_for('movies_by_genre', genre_name=genre.name) }}" class="genre-card"{% if genre.poster %} style="background-image: linear-gradient(rgba(20,20,20,0.75), rgba(20,20,20,0.75)), url('{{ genre.poster }}');"{% endif %}>
+          <span>{{ genre.name }}</span>
+          <span class="genre-count">{{ genre.count }} {{ 'title' if genre.count == 1 else 'titles' }}</span>
+        </a>
+      {% endfor %}
+    </div>
+  </div>
+  {% if ad_settings.popunder_code %}{{ ad_settings.popunder_code|safe }}{% endif %}
+  {% if ad_settings.social_bar_code %}{{ ad_settings.social_bar_code|safe }}{% endif %}
+</body>
+</html>
+"""
+# --- END OF genres_html TEMPLATE ---
+
+# --- START OF genres_css ASSET ---
+genres_css = """
   @import url('https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Roboto:wght@400;500;700&display=swap');
   :root { --netflix-red: #E50914; --netflix-black: #141414; --text-light: #f5f5f5; --text-dark: #a0a0a0; }
   * { box-sizing: border-box; margin: 0; padding: 0; }
@@ -443,7 +619,10 @@ genres_html = """
     font-weight: 700;
     transition: transform 0.3s ease, background 0.3s ease;
     border: 1px solid #444;
+    background-size: cover; background-position: center;
+    display: flex; flex-direction: column; gap: 6px;
   }
+  .genre-count { font-size: 0.85rem; font-weight: 400; color: var(--text-dark); }
   .genre-card:hover {
     transform: translateY(-5px) scale(1.03);
     background: linear-gradient(45deg, var(--netflix-red), #b00710);
@@ -455,27 +634,8 @@ genres_html = """
     .genre-grid { grid-template-columns: repeat(auto-fill, minmax(150px, 1fr)); gap: 15px; }
     .genre-card { font-size: 1.1rem; padding: 25px 15px; }
   }
-</style>
-<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.2.0/css/all.min.css">
-</head>
-<body>
-  <div class="main-container">
-    <a href="{{ url_for('home') }}" class="back-button"><i class="fas fa-arrow-left"></i> Back to Home</a>
-    <h1 class="page-title">{{ title }}</h1>
-    <div class="genre-grid">
-      {% for genre in genres %}
-        <a href="{{ url_for('movies_by_genre', genre_name=genre) }}" class="genre-card">
-          <span>{{ genre }}</span>
-        </a>
-      {% endfor %}
-    </div>
-  </div>
-  {% if ad_settings.popunder_code %}{{ ad_settings.popunder_code|safe }}{% endif %}
-  {% if ad_settings.social_bar_code %}{{ ad_settings.social_bar_code|safe }}{% endif %}
-</body>
-</html>
 """
-# --- END OF genres_html TEMPLATE ---
+# --- END OF genres_css ASSET ---
 
 
 # --- START OF detail_html TEMPLATE ---
@@ -486,7 +646,69 @@ detail_html = """
 <meta charset="UTF-8" />
 <meta name="viewport" content="width=device-width, initial-scale=1.0, user-scalable=no" />
 <title>{{ movie.title if movie else "Content Not Found" }} - MovieZone</title>
-<style>
+<link rel="stylesheet" href="{{ asset_url('detail.css') }}">
+<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.2.0/css/all.min.css">
+</head>
+<body>
+{% macro render_movie_card(m) %}
+    <a href="{{ url_for('movie_detail', movie_id=m._id) }}" class="movie-card">
+    {% if m.poster_badge %}<div class="poster-badge">{{ m.poster_badge }}</div>{% endif %}
+    <img class="movie-poster" loading="lazy" src="{{ poster_url(m, 'w342') }}" srcset="{{ poster_srcset(m) }}" sizes="(max-width: 768px) 34vw, 240px" alt="{{ m.title }}">
+    </a>
+{% endmacro %}
+
+<header class="detail-header"><a href="{{ url_for('home') }}" class="back-button"><i class="fas fa-arrow-left"></i> Back to Home</a></header>
+{% if movie %}
+<div class="detail-hero" style="min-height: auto; padding-bottom: 60px;">
+  <div class="detail-hero-background" style="background-image: url('{{ poster_url(movie, 'w500') }}');"></div>
+  <div class="detail-content-wrapper">
+    <img class="detail-poster" src="{{ poster_url(movie, 'w342') }}" srcset="{{ poster_srcset(movie) }}" sizes="(max-width: 768px) 60vw, 300px" alt="{{ movie.title }}">
+    <div class="detail-info">
+      <h1 class="detail-title">{{ movie.title }}</h1>
+      <div class="detail-meta">
+        {% if movie.release_date %}<span>{{ movie.release_date.split('-')[0] }}</span>{% endif %}
+        {% if movie.vote_average %}<span><i class="fas fa-star" style="color:#f5c518;"></i> {{ "%.1f"|format(movie.vote_average) }}</span>{% endif %}
+        {% if movie.genres %}<span>{{ movie.genres | join(' • ') }}</span>{% endif %}
+      </div>
+      <p class="detail-overview">{{ movie.overview }}</p>
+      {% if movie.watch_link and movie.type == 'movie' and not movie.is_coming_soon %}<a href="{{ url_for('watch_movie', movie_id=movie._id) }}" class="watch-now-btn"><i class="fas fa-play"></i> Watch Now</a>{% endif %}
+      {% if ad_settings.banner_ad_code %}<div class="ad-container">{{ ad_settings.banner_ad_code|safe }}</div>{% endif %}
+      {% if trailer_key %}<div class="trailer-section"><h3 class="section-title">Watch Trailer</h3><div class="video-container"><iframe src="https://www.youtube.com/embed/{{ trailer_key }}" frameborder="0" allowfullscreen></iframe></div></div>{% endif %}
+      {% if ad_settings.native_banner_code %}<div class="ad-container">{{ ad_settings.native_banner_code|safe }}</div>{% endif %}
+      <div style="margin: 20px 0;"><a href="{{ url_for('contact', report_id=movie._id, title=movie.title) }}" class="download-button" style="background-color:#5a5a5a; text-align:center;"><i class="fas fa-flag"></i> Report a Problem</a></div>
+      <div class="download-section">
+        {% if movie.is_coming_soon %}<h3 class="section-title">Coming Soon</h3>
+        {% elif movie.type == 'movie' and movie.links %}<h3 class="section-title">Download Links</h3>{% for link_item in movie.links %}<div><a class="download-button" href="{{ link_item.url }}" target="_blank" rel="noopener"><i class="fas fa-download"></i> {{ link_item.quality }} [{{ link_item.size or 'N/A' }}]</a><button class="copy-button" onclick="copyToClipboard('{{ link_item.url }}')"><i class="fas fa-copy"></i> Copy</button></div>{% endfor %}
+        {% elif movie.type == 'series' and movie.episodes %}<h3 class="section-title">Episodes</h3>{% for episode in movie.episodes | sort(attribute='episode_number') %}<div class="episode-item"><h4 class="episode-title">E{{ episode.episode_number }}: {{ episode.title }}</h4>{% if episode.overview %}<p class="episode-overview-text">{{ episode.overview }}</p>{% endif %}{% if episode.watch_link %}<a href="{{ url_for('watch_movie', movie_id=movie._id, ep=episode.episode_number) }}" class="episode-download-button" style="background-color: var(--netflix-red);"><i class="fas fa-play"></i> Watch Episode</a>{% endif %}{% if episode.links %}{% for link_item in episode.links %}<div><a class="episode-download-button" href="{{ link_item.url }}" target="_blank" rel="noopener"><i class="fas fa-download"></i> {{ link_item.quality }}</a><button class="copy-button" onclick="copyToClipboard('{{ link_item.url }}')"><i class="fas fa-copy"></i></button></div>{% endfor %}{% endif %}</div>{% endfor %}
+        {% endif %}
+        {% if not movie.links and not movie.episodes and not movie.is_coming_soon %}<p class="no-link-message">No download links available.</p>{% endif %}
+      </div>
+    </div>
+  </div>
+</div>
+{% if related_movies %}
+<div class="related-section-container">
+    <div class="carousel-row" style="margin-top: 20px; margin-bottom: 20px;">
+        <h3 class="section-title" style="margin-left: 50px; border-color: var(--netflix-red); color: white;">You Might Also Like</h3>
+        <div class="carousel-wrapper">
+            <div class="carousel-content">{% for m in related_movies %}<div class="related-movie-card-wrapper">{{ render_movie_card(m) }}</div>{% endfor %}</div>
+            <button class="carousel-arrow prev"><i class="fas fa-chevron-left"></i></button>
+            <button class="carousel-arrow next"><i class="fas fa-chevron-right"></i></button>
+        </div>
+    </div>
+</div>
+{% endif %}
+{% else %}<div style="display:flex; justify-content:center; align-items:center; height:100vh;"><h2>Content not found.</h2></div>{% endif %}
+<script src="{{ asset_url('detail.js') }}"></script>
+{% if ad_settings.popunder_code %}{{ ad_settings.popunder_code|safe }}{% endif %}
+{% if ad_settings.social_bar_code %}{{ ad_settings.social_bar_code|safe }}{% endif %}
+</body>
+</html>
+"""
+# --- END OF detail_html TEMPLATE ---
+
+# --- START OF detail_css ASSET ---
+detail_css = """
   @import url('https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Roboto:wght@400;500;700&display=swap');
   :root { --netflix-red: #E50914; --netflix-black: #141414; --text-light: #f5f5f5; --text-dark: #a0a0a0; }
   * { box-sizing: border-box; margin: 0; padding: 0; }
@@ -548,60 +770,11 @@ detail_html = """
     .carousel-content { padding: 0 15px; } .related-movie-card-wrapper { min-width: 130px; }
     .carousel-arrow { display: none; }
   }
-</style>
-<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.2.0/css/all.min.css">
-</head>
-<body>
-{% macro render_movie_card(m) %}
-    <a href="{{ url_for('movie_detail', movie_id=m._id) }}" class="movie-card">
-    {% if m.poster_badge %}<div class="poster-badge">{{ m.poster_badge }}</div>{% endif %}
-    <img class="movie-poster" loading="lazy" src="{{ m.poster or 'https://via.placeholder.com/400x600.png?text=No+Image' }}" alt="{{ m.title }}">
-    </a>
-{% endmacro %}
+"""
+# --- END OF detail_css ASSET ---
 
-<header class="detail-header"><a href="{{ url_for('home') }}" class="back-button"><i class="fas fa-arrow-left"></i> Back to Home</a></header>
-{% if movie %}
-<div class="detail-hero" style="min-height: auto; padding-bottom: 60px;">
-  <div class="detail-hero-background" style="background-image: url('{{ movie.poster }}');"></div>
-  <div class="detail-content-wrapper">
-    <img class="detail-poster" src="{{ movie.poster or 'https://via.placeholder.com/400x600.png?text=No+Image' }}" alt="{{ movie.title }}">
-    <div class="detail-info">
-      <h1 class="detail-title">{{ movie.title }}</h1>
-      <div class="detail-meta">
-        {% if movie.release_date %}<span>{{ movie.release_date.split('-')[0] }}</span>{% endif %}
-        {% if movie.vote_average %}<span><i class="fas fa-star" style="color:#f5c518;"></i> {{ "%.1f"|format(movie.vote_average) }}</span>{% endif %}
-        {% if movie.genres %}<span>{{ movie.genres | join(' • ') }}</span>{% endif %}
-      </div>
-      <p class="detail-overview">{{ movie.overview }}</p>
-      {% if movie.watch_link and movie.type == 'movie' and not movie.is_coming_soon %}<a href="{{ url_for('watch_movie', movie_id=movie._id) }}" class="watch-now-btn"><i class="fas fa-play"></i> Watch Now</a>{% endif %}
-      {% if ad_settings.banner_ad_code %}<div class="ad-container">{{ ad_settings.banner_ad_code|safe }}</div>{% endif %}
-      {% if trailer_key %}<div class="trailer-section"><h3 class="section-title">Watch Trailer</h3><div class="video-container"><iframe src="https://www.youtube.com/embed/{{ trailer_key }}" frameborder="0" allowfullscreen></iframe></div></div>{% endif %}
-      {% if ad_settings.native_banner_code %}<div class="ad-container">{{ ad_settings.native_banner_code|safe }}</div>{% endif %}
-      <div style="margin: 20px 0;"><a href="{{ url_for('contact', report_id=movie._id, title=movie.title) }}" class="download-button" style="background-color:#5a5a5a; text-align:center;"><i class="fas fa-flag"></i> Report a Problem</a></div>
-      <div class="download-section">
-        {% if movie.is_coming_soon %}<h3 class="section-title">Coming Soon</h3>
-        {% elif movie.type == 'movie' and movie.links %}<h3 class="section-title">Download Links</h3>{% for link_item in movie.links %}<div><a class="download-button" href="{{ link_item.url }}" target="_blank" rel="noopener"><i class="fas fa-download"></i> {{ link_item.quality }} [{{ link_item.size or 'N/A' }}]</a><button class="copy-button" onclick="copyToClipboard('{{ link_item.url }}')"><i class="fas fa-copy"></i> Copy</button></div>{% endfor %}
-        {% elif movie.type == 'series' and movie.episodes %}<h3 class="section-title">Episodes</h3>{% for episode in movie.episodes | sort(attribute='episode_number') %}<div class="episode-item"><h4 class="episode-title">E{{ episode.episode_number }}: {{ episode.title }}</h4>{% if episode.overview %}<p class="episode-overview-text">{{ episode.overview }}</p>{% endif %}{% if episode.watch_link %}<a href="{{ url_for('watch_movie', movie_id=movie._id, ep=episode.episode_number) }}" class="episode-download-button" style="background-color: var(--netflix-red);"><i class="fas fa-play"></i> Watch Episode</a>{% endif %}{% if episode.links %}{% for link_item in episode.links %}<div><a class="episode-download-button" href="{{ link_item.url }}" target="_blank" rel="noopener"><i class="fas fa-download"></i> {{ link_item.quality }}</a><button class="copy-button" onclick="copyToClipboard('{{ link_item.url }}')"><i class="fas fa-copy"></i></button></div>{% endfor %}{% endif %}</div>{% endfor %}
-        {% endif %}
-        {% if not movie.links and not movie.episodes and not movie.is_coming_soon %}<p class="no-link-message">No download links available.</p>{% endif %}
-      </div>
-    </div>
-  </div>
-</div>
-{% if related_movies %}
-<div class="related-section-container">
-    <div class="carousel-row" style="margin-top: 20px; margin-bottom: 20px;">
-        <h3 class="section-title" style="margin-left: 50px; border-color: var(--netflix-red); color: white;">You Might Also Like</h3>
-        <div class="carousel-wrapper">
-            <div class="carousel-content">{% for m in related_movies %}<div class="related-movie-card-wrapper">{{ render_movie_card(m) }}</div>{% endfor %}</div>
-            <button class="carousel-arrow prev"><i class="fas fa-chevron-left"></i></button>
-            <button class="carousel-arrow next"><i class="fas fa-chevron-right"></i></button>
-        </div>
-    </div>
-</div>
-{% endif %}
-{% else %}<div style="display:flex; justify-content:center; align-items:center; height:100vh;"><h2>Content not found.</h2></div>{% endif %}
-<script>
+# --- START OF detail_js ASSET ---
+detail_js = """
 function copyToClipboard(text) { navigator.clipboard.writeText(text).then(() => alert('Link copied!'), () => alert('Copy failed!')); }
 document.querySelectorAll('.carousel-arrow').forEach(button => {
     button.addEventListener('click', () => {
@@ -610,13 +783,8 @@ document.querySelectorAll('.carousel-arrow').forEach(button => {
         carousel.scrollLeft += button.classList.contains('next') ? scrollAmount : -scrollAmount;
     });
 });
-</script>
-{% if ad_settings.popunder_code %}{{ ad_settings.popunder_code|safe }}{% endif %}
-{% if ad_settings.social_bar_code %}{{ ad_settings.social_bar_code|safe }}{% endif %}
-</body>
-</html>
 """
-# --- END OF detail_html TEMPLATE ---
+# --- END OF detail_js ASSET ---
 
 
 # --- START OF watch_html TEMPLATE ---
@@ -664,6 +832,9 @@ admin_html = """
     .action-buttons a:hover, .action-buttons button:hover, .delete-btn:hover { opacity: 0.8; }
     .episode-item { border: 1px solid var(--light-gray); padding: 15px; margin-bottom: 15px; border-radius: 5px; }
     hr.section-divider { border: 0; height: 2px; background-color: var(--light-gray); margin: 40px 0; }
+    .table-filters { display: flex; gap: 10px; flex-wrap: wrap; }
+    .table-filters input { flex: 2 1 250px; } .table-filters select { flex: 1 1 150px; width: auto; }
+    .load-more-btn { display: none; margin-top: 15px; }
   </style>
   <link href="https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Roboto:wght@400;700&display=swap" rel="stylesheet">
 </head>
@@ -697,23 +868,89 @@ admin_html = """
     <button type="submit">Add Content</button>
   </form>
   <hr class="section-divider">
+  <h2>Bulk Import / Export</h2>
+  <form id="import_form" method="post" action="{{ url_for('admin_import') }}" enctype="multipart/form-data">
+    <div class="form-group"><label>NDJSON or CSV file (rows with an _id or a matching title + type are updated):</label><input type="file" name="file" accept=".ndjson,.jsonl,.json,.csv" required /></div>
+    <button type="submit">Import</button>
+    <pre id="import_result" style="white-space: pre-wrap;"></pre>
+  </form>
+  <p><a href="{{ url_for('admin_export', format='ndjson') }}">Export NDJSON</a> | <a href="{{ url_for('admin_export', format='csv') }}">Export CSV</a></p>
+  <hr class="section-divider">
   <h2>Manage Content</h2>
-  <table><thead><tr><th>Title</th><th>Type</th><th>Badge</th><th>Actions</th></tr></thead><tbody>
-    {% for movie in all_content %}<tr><td>{{ movie.title }}</td><td>{{ movie.type | title }}</td><td>{{ movie.poster_badge or 'N/A' }}</td><td class="action-buttons"><a href="{{ url_for('edit_movie', movie_id=movie._id) }}" class="edit-btn">Edit</a><button class="delete-btn" onclick="confirmDelete('{{ movie._id }}', '{{ movie.title }}')">Delete</button></td></tr>{% endfor %}
-  </tbody></table>
-  {% if not all_content %}<p>No content found.</p>{% endif %}
+  <div class="table-filters">
+    <input type="text" id="content_q" placeholder="Search by title..." autocomplete="off" />
+    <select id="content_type_filter"><option value="">All Types</option><option value="movie">Movie</option><option value="series">TV/Web Series</option></select>
+    <select id="content_badge_filter"><option value="">All Badges</option>{% for badge in all_badges %}<option value="{{ badge }}">{{ badge }}</option>{% endfor %}</select>
+  </div>
+  <table><thead><tr><th>Title</th><th>Type</th><th>Badge</th><th>Actions</th></tr></thead><tbody id="content_rows"></tbody></table>
+  <p id="content_empty" style="display: none;">No content found.</p>
+  <button type="button" id="content_more" class="add-episode-btn load-more-btn">Load More</button>
   <hr class="section-divider">
   <h2>User Feedback / Reports</h2>
-    {% if feedback_list %}
-    <table><thead><tr><th>Date</th><th>Type</th><th>Title</th><th>Message</th><th>Email</th><th>Action</th></tr></thead><tbody>
-      {% for item in feedback_list %}<tr><td style="min-width: 150px;">{{ item.timestamp.strftime('%Y-%m-%d %H:%M') }}</td><td>{{ item.type }}</td><td>{{ item.content_title }}</td><td style="white-space: pre-wrap; min-width: 300px;">{{ item.message }}</td><td>{{ item.email or 'N/A' }}</td><td><a href="{{ url_for('delete_feedback', feedback_id=item._id) }}" class="delete-btn" onclick="return confirm('Delete this feedback?');">Delete</a></td></tr>{% endfor %}
-    </tbody></table>
-    {% else %}<p>No new feedback or reports.</p>{% endif %}
+  <table><thead><tr><th>Date</th><th>Type</th><th>Title</th><th>Message</th><th>Email</th><th>Action</th></tr></thead><tbody id="feedback_rows"></tbody></table>
+  <p id="feedback_empty" style="display: none;">No new feedback or reports.</p>
+  <button type="button" id="feedback_more" class="add-episode-btn load-more-btn">Load More</button>
   <script>
     function confirmDelete(id, title) { if (confirm('Delete "' + title + '"?')) window.location.href = '/delete_movie/' + id; }
     function toggleEpisodeFields() { var isSeries = document.getElementById('content_type').value === 'series'; document.getElementById('episode_fields').style.display = isSeries ? 'block' : 'none'; document.getElementById('movie_fields').style.display = isSeries ? 'none' : 'block'; }
     function addEpisodeField() { const c = document.getElementById('episodes_container'), d = document.createElement('div'); d.className = 'episode-item'; d.innerHTML = `<div class="form-group"><label>Ep Number:</label><input type="number" name="episode_number[]" required /></div><div class="form-group"><label>Ep Title:</label><input type="text" name="episode_title[]" required /></div><div class="form-group"><label>Watch Link:</label><input type="url" name="episode_watch_link[]" /></div><hr><p>OR Download Links</p><div class="form-group"><label>480p Link:</label><input type="url" name="episode_link_480p[]" /></div><div class="form-group"><label>720p Link:</label><input type="url" name="episode_link_720p[]" /></div><button type="button" onclick="this.parentElement.remove()" class="delete-btn" style="padding: 6px 12px;">Remove Ep</button>`; c.appendChild(d); }
     document.addEventListener('DOMContentLoaded', toggleEpisodeFields);
+    function addCell(row, text, style) { const td = document.createElement('td'); td.textContent = text; if (style) td.style.cssText = style; row.appendChild(td); return td; }
+    function pagedTable(baseUrl, prefix, renderRow) {
+      const rows = document.getElementById(prefix + '_rows'), more = document.getElementById(prefix + '_more'), empty = document.getElementById(prefix + '_empty');
+      let next = null, seq = 0;
+      function load(reset, params) {
+        const current = ++seq;
+        fetch(reset ? baseUrl + '?' + new URLSearchParams(params || {}) : next, { credentials: 'same-origin' }).then(r => r.json()).then(data => {
+          if (current !== seq) return;
+          if (reset) rows.innerHTML = '';
+          data.items.forEach(item => rows.appendChild(renderRow(item)));
+          next = data.next;
+          more.style.display = next ? 'inline-block' : 'none';
+          empty.style.display = rows.children.length ? 'none' : 'block';
+        });
+      }
+      more.addEventListener('click', () => load(false));
+      return load;
+    }
+    const loadContent = pagedTable('{{ url_for('admin_content_api') }}', 'content', item => {
+      const row = document.createElement('tr');
+      addCell(row, item.title); addCell(row, item.type ? item.type.charAt(0).toUpperCase() + item.type.slice(1) : ''); addCell(row, item.poster_badge || 'N/A');
+      const actions = addCell(row, ''), edit = document.createElement('a'), del = document.createElement('button');
+      actions.className = 'action-buttons';
+      edit.href = item.edit_url; edit.className = 'edit-btn'; edit.textContent = 'Edit';
+      del.className = 'delete-btn'; del.textContent = 'Delete'; del.onclick = () => confirmDelete(item._id, item.title);
+      actions.append(edit, del);
+      return row;
+    });
+    const loadFeedback = pagedTable('{{ url_for('admin_feedback_api') }}', 'feedback', item => {
+      const row = document.createElement('tr');
+      addCell(row, item.date, 'min-width: 150px;'); addCell(row, item.type); addCell(row, item.content_title);
+      addCell(row, item.message, 'white-space: pre-wrap; min-width: 300px;'); addCell(row, item.email || 'N/A');
+      const del = document.createElement('a');
+      del.href = item.delete_url; del.className = 'delete-btn'; del.textContent = 'Delete'; del.onclick = () => confirm('Delete this feedback?');
+      addCell(row, '').appendChild(del);
+      return row;
+    });
+    const contentFilters = () => {
+      const params = {}, q = document.getElementById('content_q').value.trim(), type = document.getElementById('content_type_filter').value, badge = document.getElementById('content_badge_filter').value;
+      if (q) params.q = q; if (type) params.type = type; if (badge) params.badge = badge;
+      loadContent(true, params);
+    };
+    let filterTimer;
+    document.getElementById('content_q').addEventListener('input', () => { clearTimeout(filterTimer); filterTimer = setTimeout(contentFilters, 250); });
+    document.getElementById('content_type_filter').addEventListener('change', contentFilters);
+    document.getElementById('content_badge_filter').addEventListener('change', contentFilters);
+    contentFilters();
+    document.getElementById('import_form').addEventListener('submit', e => {
+      e.preventDefault();
+      const result = document.getElementById('import_result');
+      result.textContent = 'Importing...';
+      fetch(e.target.action, { method: 'POST', body: new FormData(e.target), credentials: 'same-origin' }).then(r => r.json())
+        .then(summary => { result.textContent = JSON.stringify(summary, null, 2); contentFilters(); })
+        .catch(() => { result.textContent = 'Import failed.'; });
+    });
+    loadFeedback(true);
   </script>
 </body></html>
 """
@@ -797,19 +1034,7 @@ contact_html = """
 <html lang="bn">
 <head>
     <meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0"><title>Contact Us / Report - MovieZone</title>
-    <style>
-        :root { --netflix-red: #E50914; --netflix-black: #141414; --dark-gray: #222; --light-gray: #333; --text-light: #f5f5f5; }
-        body { font-family: 'Roboto', sans-serif; background: var(--netflix-black); color: var(--text-light); padding: 20px; display: flex; justify-content: center; align-items: center; min-height: 100vh; }
-        .contact-container { max-width: 600px; width: 100%; background: var(--dark-gray); padding: 30px; border-radius: 8px; }
-        h2 { font-family: 'Bebas Neue', sans-serif; color: var(--netflix-red); font-size: 2.5rem; text-align: center; margin-bottom: 25px; }
-        .form-group { margin-bottom: 20px; } label { display: block; margin-bottom: 8px; font-weight: bold; }
-        input, select, textarea { width: 100%; padding: 12px; border-radius: 4px; border: 1px solid var(--light-gray); font-size: 1rem; background: var(--light-gray); color: var(--text-light); box-sizing: border-box; }
-        textarea { resize: vertical; min-height: 120px; }
-        button[type="submit"] { background: var(--netflix-red); color: white; font-weight: 700; cursor: pointer; border: none; padding: 12px 25px; border-radius: 4px; font-size: 1.1rem; width: 100%; transition: background 0.3s ease; }
-        button[type="submit"]:hover { background: #b00710; }
-        .success-message { text-align: center; padding: 20px; background-color: #1f4e2c; color: #d4edda; border-radius: 5px; margin-bottom: 20px; }
-        .back-link { display: block; text-align: center; margin-top: 20px; color: var(--netflix-red); text-decoration: none; font-weight: bold; }
-    </style>
+    <link rel="stylesheet" href="{{ asset_url('contact.css') }}">
     <link href="https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Roboto:wght@400;700&display=swap" rel="stylesheet">
 </head>
 <body>
@@ -819,6 +1044,7 @@ contact_html = """
             <div class="success-message"><p>আপনার বার্তা সফলভাবে পাঠানো হয়েছে। ধন্যবাদ!</p><p>Your message has been sent successfully. Thank you!</p></div>
             <a href="{{ url_for('home') }}" class="back-link">← Back to Home</a>
         {% else %}
+            {% if error_message %}<div class="error-message"><p>{{ error_message }}</p></div>{% endif %}
             <form method="post">
                 <div class="form-group"><label for="type">বিষয় (Subject):</label>
                     <select name="type" id="type">
@@ -841,95 +1067,982 @@ contact_html = """
 """
 # --- END OF contact_html TEMPLATE ---
 
+# --- START OF contact_css ASSET ---
+contact_css = """
+        :root { --netflix-red: #E50914; --netflix-black: #141414; --dark-gray: #222; --light-gray: #333; --text-light: #f5f5f5; }
+        body { font-family: 'Roboto', sans-serif; background: var(--netflix-black); color: var(--text-light); padding: 20px; display: flex; justify-content: center; align-items: center; min-height: 100vh; }
+        .contact-container { max-width: 600px; width: 100%; background: var(--dark-gray); padding: 30px; border-radius: 8px; }
+        h2 { font-family: 'Bebas Neue', sans-serif; color: var(--netflix-red); font-size: 2.5rem; text-align: center; margin-bottom: 25px; }
+        .form-group { margin-bottom: 20px; } label { display: block; margin-bottom: 8px; font-weight: bold; }
+        input, select, textarea { width: 100%; padding: 12px; border-radius: 4px; border: 1px solid var(--light-gray); font-size: 1rem; background: var(--light-gray); color: var(--text-light); box-sizing: border-box; }
+        textarea { resize: vertical; min-height: 120px; }
+        button[type="submit"] { background: var(--netflix-red); color: white; font-weight: 700; cursor: pointer; border: none; padding: 12px 25px; border-radius: 4px; font-size: 1.1rem; width: 100%; transition: background 0.3s ease; }
+        button[type="submit"]:hover { background: #b00710; }
+        .success-message { text-align: center; padding: 20px; background-color: #1f4e2c; color: #d4edda; border-radius: 5px; margin-bottom: 20px; }
+        .error-message { text-align: center; padding: 15px; background-color: #5a1a1f; color: #f8d7da; border-radius: 5px; margin-bottom: 20px; }
+        .back-link { display: block; text-align: center; margin-top: 20px; color: var(--netflix-red); text-decoration: none; font-weight: bold; }
+"""
+# --- END OF contact_css ASSET ---
+
+
+# --- টেমপ্লেট রেজিস্ট্রি: স্টার্টআপে একবার কম্পাইল হয়, প্রতি রিকোয়েস্টে আর পার্স করতে হয় না ---
+TEMPLATES = {
+    "index.html": index_html, "card_macros.html": card_macros_html, "cards.html": cards_html, "detail.html": detail_html, "admin.html": admin_html, "edit.html": edit_html,
+    "genres.html": genres_html, "watch.html": watch_html, "contact.html": contact_html
+}
+app.jinja_loader = DictLoader(TEMPLATES)
+# ঐচ্ছিক: TEMPLATE_CACHE_DIR দিলে কম্পাইল করা বাইটকোড ডিস্কে থাকে, রিস্টার্টেও আবার কম্পাইল লাগে না
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR")
+if TEMPLATE_CACHE_DIR:
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    app.jinja_options = {**app.jinja_options, "bytecode_cache": FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)}
+for template_name in TEMPLATES: app.jinja_env.get_template(template_name)
+
+# --- রেসপন্স কমপ্রেশন: Accept-Encoding অনুযায়ী br (brotli ইনস্টল থাকলে) বা gzip, ছোট রেসপন্স যেমন আছে তেমন যায় ---
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ("text/html", "text/css", "text/plain", "text/csv", "application/javascript", "application/json", "image/svg+xml")
+
+def negotiate_encoding():
+    for encoding in ("br", "gzip") if brotli else ("gzip",):
+        if request.accept_encodings.quality(encoding) > 0: return encoding
+    return None
+
+def compress(body, encoding):
+    if encoding == "br": return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+# ক্যাশ করা বডির জন্য: variants ডিকশনারিতে প্রতিটি এনকোডিং একবারই কমপ্রেস হয়ে থাকে
+def encoded_response(body, mimetype, variants, encoding):
+    if encoding and len(body) >= COMPRESS_MIN_SIZE:
+        if encoding not in variants: variants[encoding] = compress(body, encoding)
+        response = Response(variants[encoding], mimetype=mimetype)
+        response.headers["Content-Encoding"] = encoding
+    else: response = Response(body, mimetype=mimetype)
+    response.vary.add("Accept-Encoding")
+    return response
+
+# ক্যাশের বাইরে থেকে আসা রেসপন্স (JSON API, অ্যাডমিন পেজ ইত্যাদি) প্রতিবার কমপ্রেস হয়
+@app.after_request
+def compress_response(response):
+    if response.mimetype not in COMPRESSIBLE_TYPES or response.direct_passthrough or response.is_streamed: return response
+    response.vary.add("Accept-Encoding")
+    if response.status_code != 200 or "Content-Encoding" in response.headers: return response
+    encoding = negotiate_encoding()
+    if encoding and response.content_length and response.content_length >= COMPRESS_MIN_SIZE:
+        response.set_data(compress(response.get_data(), encoding))
+        response.headers["Content-Encoding"] = encoding
+        if response.get_etag()[0]: response.set_etag(f"{response.get_etag()[0]}-{encoding}")
+    return response
+
+# --- স্ট্যাটিক অ্যাসেট: শেয়ার করা CSS/JS আলাদা ফাইলে, নামে কনটেন্ট হ্যাশ (index.3f2a9c1b0d.css) ---
+# কনটেন্ট বদলালে নামও বদলায়, তাই ব্রাউজার/CDN এক বছর ক্যাশ রাখতে পারে; HTML প্রতি রিকোয়েস্টে ছোট হয়
+ASSETS = {
+    "index.css": index_css, "index.js": index_js, "genres.css": genres_css, "detail.css": detail_css, "detail.js": detail_js, "contact.css": contact_css,
+    "poster-placeholder.svg": poster_placeholder_svg
+}
+ASSET_TYPES = {"css": "text/css; charset=utf-8", "js": "application/javascript; charset=utf-8", "svg": "image/svg+xml"}
+asset_files = {} # hashed name -> (body, mimetype, etag, compressed variants)
+asset_names = {} # logical name -> hashed name
+for asset_name, asset_body in ASSETS.items():
+    asset_body = asset_body.strip().encode("utf-8")
+    digest = hashlib.sha256(asset_body).hexdigest()[:10]
+    stem, ext = asset_name.rsplit(".", 1)
+    asset_names[asset_name] = f"{stem}.{digest}.{ext}"
+    asset_files[asset_names[asset_name]] = (asset_body, ASSET_TYPES[ext], digest, {})
+
+def asset_url(name):
+    return url_for('asset', name=asset_names[name])
+
+app.jinja_env.globals["asset_url"] = asset_url
+# --- পোস্টার প্রক্সি: /img/<id>/<size> মূল পোস্টার একবার এনে কার্ডের মাপে ছোট করে ডিস্কে রাখে ---
+# URL এ ?v=<পোস্টার URL এর হ্যাশ>, তাই পোস্টার বদলালে URL ও বদলায় এবং ব্রাউজার/CDN এক বছর ক্যাশ রাখতে পারে
+POSTER_SIZES = {"w185": 185, "w342": 342, "w500": 500}
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "image_cache")
+IMAGE_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_FAILURE_TTL = 300 # অরিজিন ব্যর্থ হলে এতক্ষণ আর চেষ্টা নয়, সরাসরি প্লেসহোল্ডার
+image_session = requests.Session()
+image_session.headers["User-Agent"] = "MovieZone poster cache"
+image_locks = {} # source hash -> lock, একই পোস্টার একসাথে দুবার আনা হয় না
+image_locks_lock = threading.Lock()
+
+def poster_version(poster):
+    return hashlib.sha256(poster.encode("utf-8")).hexdigest()[:10]
+
+def poster_url(movie, size):
+    if not movie.get("poster"): return asset_url("poster-placeholder.svg")
+    return url_for('poster_image', movie_id=movie["_id"], size=size, v=poster_version(movie["poster"]))
+
+def poster_srcset(movie):
+    if not movie.get("poster") or not Image: return "" # Pillow ছাড়া সব মাপের ফাইল একই, srcset অর্থহীন
+    return ", ".join(f"{poster_url(movie, size)} {width}w" for size, width in POSTER_SIZES.items())
+
+app.jinja_env.globals.update(poster_url=poster_url, poster_srcset=poster_srcset)
+
+class PosterUnavailable(requests.RequestException): pass
+
+def fetch_poster(source):
+    with image_session.get(source, timeout=(3, 5), stream=True) as response:
+        response.raise_for_status()
+        if not response.headers.get("Content-Type", "").startswith("image/"): raise ValueError(f"not an image: {response.headers.get('Content-Type')}")
+        body = b""
+        for chunk in response.iter_content(64 * 1024):
+            body += chunk
+            if len(body) > IMAGE_MAX_BYTES: raise ValueError("image too large")
+        return body, response.headers["Content-Type"].split(";")[0]
+
+def resize_poster(body, width):
+    image = Image.open(io.BytesIO(body))
+    image.thumbnail((width, width * 3 // 2 or 1), Image.LANCZOS)
+    out = io.BytesIO()
+    image.convert("RGB").save(out, "JPEG", quality=80, optimize=True, progressive=True)
+    return out.getvalue()
+
+# ব্যর্থতার চিহ্ন ফাইলে রাখা হয় যাতে সব ওয়ার্কার প্রসেস দেখতে পায়
+def poster_failed_recently(folder):
+    try: return time.time() - os.path.getmtime(os.path.join(folder, "failed")) < IMAGE_FAILURE_TTL
+    except OSError: return False
+
+def store_poster(source, folder):
+    body, content_type = fetch_poster(source)
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "type"), "w") as f: f.write("image/jpeg" if Image else content_type)
+    for name, width in POSTER_SIZES.items():
+        target = os.path.join(folder, name)
+        with open(f"{target}.tmp", "wb") as f: f.write(resize_poster(body, width) if Image else body)
+        os.replace(f"{target}.tmp", target)
+
+# প্রথমবার সব মাপ একসাথে তৈরি হয়; ফাইল: IMAGE_CACHE_DIR/<source hash>/<size> (Pillow না থাকলে মূল ছবিই)
+def cached_poster(source, size):
+    version = poster_version(source)
+    folder = os.path.join(IMAGE_CACHE_DIR, version)
+    path = os.path.join(folder, size)
+    if not os.path.exists(path):
+        if poster_failed_recently(folder): raise PosterUnavailable(f"origin failed within the last {IMAGE_FAILURE_TTL}s")
+        with image_locks_lock: lock = image_locks.setdefault(version, threading.Lock())
+        try:
+            with lock:
+                if not os.path.exists(path):
+                    if poster_failed_recently(folder): raise PosterUnavailable(f"origin failed within the last {IMAGE_FAILURE_TTL}s")
+                    try: store_poster(source, folder)
+                    except (requests.RequestException, ValueError, OSError) as e:
+                        os.makedirs(folder, exist_ok=True)
+                        with open(os.path.join(folder, "failed"), "w") as f: f.write(str(e)[:500])
+                        raise
+        finally:
+            with image_locks_lock: image_locks.pop(version, None)
+    with open(path, "rb") as f: body = f.read()
+    with open(os.path.join(folder, "type")) as f: content_type = f.read()
+    return body, content_type
+
+@app.route('/img/<movie_id>/<size>')
+def poster_image(movie_id, size):
+    if size not in POSTER_SIZES: return "Unknown size", 404
+    get_catalog_version()
+    title_index.ensure_built()
+    card = title_index.cards.get(movie_id)
+    if card is None and ObjectId.is_valid(movie_id): card = movies.find_one({"_id": ObjectId(movie_id)}, {"poster": 1})
+    if card is None: return "Not found", 404
+    if not card.get("poster"): return redirect(asset_url("poster-placeholder.svg"))
+    source = card["poster"]
+    try: body, content_type = cached_poster(source, size)
+    except PosterUnavailable:
+        response = redirect(asset_url("poster-placeholder.svg"))
+        response.headers["Cache-Control"] = "public, max-age=60"
+        return response
+    except (requests.RequestException, ValueError, OSError) as e:
+        print(f"Poster fetch failed for {movie_id}: {e}")
+        return redirect(source) # অরিজিন থেকে সরাসরি, পরের রিকোয়েস্টে আবার চেষ্টা হবে
+    response = Response(body, mimetype=content_type)
+    response.set_etag(hashlib.sha256(body).hexdigest()[:16])
+    # পুরনো ?v= (পোস্টার এর মধ্যে বদলে গেছে) হলে অল্প সময়ের ক্যাশ
+    immutable = request.args.get("v") == poster_version(source)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable" if immutable else "public, max-age=300"
+    return response.make_conditional(request)
+
+# ডিপ্লয়ে টেমপ্লেট বা অ্যাসেট বদলালে পেজের ETag ও বদলায়
+PAGE_BUILD = hashlib.sha256("".join([*TEMPLATES.values(), *asset_names.values()]).encode("utf-8")).hexdigest()[:8]
+
+@app.route('/assets/<name>')
+def asset(name):
+    if name not in asset_files: return "Not found", 404
+    body, mimetype, etag, variants = asset_files[name]
+    encoding = negotiate_encoding()
+    response = encoded_response(body, mimetype, variants, encoding)
+    response.set_etag(f"{etag}-{encoding}" if "Content-Encoding" in response.headers else etag)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response.make_conditional(request)
+
 
 # ----------------- Flask Routes (Final Version) -----------------
 
-def get_tmdb_details(movie_obj):
-    if not TMDB_API_KEY: return movie_obj
+# --- TMDb HTTP ক্লায়েন্ট: keep-alive সেশন (কানেকশন পুল), টোকেন-বাকেট রেট লিমিট, 429 এ Retry-After মানা হয় ---
+TMDB_RATE_LIMIT = float(os.getenv("TMDB_RATE_LIMIT", 30)) # প্রতি সেকেন্ডে রিকোয়েস্ট
+TMDB_POOL_SIZE = 10
+TMDB_MAX_429_RETRIES = 2
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate, self.capacity = rate, capacity
+        self.tokens, self.updated, self.paused_until = capacity, time.monotonic(), 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    # 429 পেলে সব থ্রেড একসাথে থামে
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+# --- TMDb সার্কিট ব্রেকার: পরপর ব্যর্থ বা ধীর কল হলে কিছুক্ষণ TMDb তে কোনো কল যায় না, সংরক্ষিত ডেটাই চলে ---
+TMDB_FAILURE_THRESHOLD = int(os.getenv("TMDB_FAILURE_THRESHOLD", 5))
+TMDB_SLOW_CALL_SECONDS = float(os.getenv("TMDB_SLOW_CALL_SECONDS", 2.5))
+TMDB_RESET_TIMEOUT = float(os.getenv("TMDB_RESET_TIMEOUT", 30))
+
+class TmdbUnavailable(requests.RequestException):
+    pass
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold, slow_call_seconds, reset_timeout):
+        self.failure_threshold, self.slow_call_seconds, self.reset_timeout = failure_threshold, slow_call_seconds, reset_timeout
+        self.state, self.failures, self.opened_at, self.probing = "closed", 0, 0, False
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0, "last_error": None}
+        self.lock = threading.Lock()
+
+    # half_open অবস্থায় শুধু একটি প্রোব কল যেতে পারে
+    def allow(self):
+        with self.lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state, self.probing = "half_open", False
+            if self.state == "closed" or (self.state == "half_open" and not self.probing):
+                self.probing = self.state == "half_open"
+                self.stats["calls"] += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self, elapsed):
+        if elapsed > self.slow_call_seconds: return self.record_failure(f"slow call ({elapsed:.1f}s)")
+        with self.lock:
+            # ব্রেকার খোলার আগে শুরু হওয়া কল পরে সফল হলেও ব্রেকার খোলাই থাকে; বন্ধ করতে পারে শুধু half_open প্রোব
+            if self.state == "open": return
+            self.state, self.failures, self.probing = "closed", 0, False
+
+    def record_failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self.stats["failures"] += 1
+            self.stats["last_error"] = str(error)
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open": self.stats["opened"] += 1
+                self.state, self.opened_at, self.probing = "open", time.monotonic(), False
+
+    def status(self):
+        with self.lock:
+            retry_in = max(0, self.reset_timeout - (time.monotonic() - self.opened_at)) if self.state == "open" else 0
+            return {"state": self.state, "consecutive_failures": self.failures, "retry_in": round(retry_in, 1), **self.stats}
+
+tmdb_breaker = CircuitBreaker(TMDB_FAILURE_THRESHOLD, TMDB_SLOW_CALL_SECONDS, TMDB_RESET_TIMEOUT)
+tmdb_rate_limiter = TokenBucket(TMDB_RATE_LIMIT, TMDB_RATE_LIMIT)
+tmdb_session = requests.Session()
+tmdb_adapter = HTTPAdapter(pool_connections=2, pool_maxsize=TMDB_POOL_SIZE, max_retries=Retry(
+    total=2, read=0, status_forcelist=(502, 503, 504), allowed_methods=["GET"], backoff_factor=0.5, raise_on_status=False))
+tmdb_session.mount("https://", tmdb_adapter)
+tmdb_session.mount("http://", tmdb_adapter)
+
+def retry_after_seconds(res):
+    value = res.headers.get("Retry-After", "1")
+    try: return min(max(float(value), 0), 60)
+    except ValueError: pass
+    try: retry_at = parsedate_to_datetime(value) # HTTP-date ফরম্যাট
+    except (TypeError, ValueError): return 1
+    return min(max((retry_at - datetime.now(retry_at.tzinfo)).total_seconds(), 0), 60)
+
+def tmdb_request(path, params):
+    for attempt in range(TMDB_MAX_429_RETRIES + 1):
+        tmdb_rate_limiter.acquire()
+        if not tmdb_breaker.allow(): raise TmdbUnavailable("TMDb circuit breaker is open")
+        started = time.monotonic()
+        try: res = tmdb_session.get(f"{TMDB_BASE_URL}/{path}", params={**params, "api_key": TMDB_API_KEY}, timeout=5)
+        except requests.RequestException as e:
+            tmdb_breaker.record_failure(e)
+            raise
+        if res.status_code >= 500: tmdb_breaker.record_failure(f"HTTP {res.status_code}")
+        else: tmdb_breaker.record_success(time.monotonic() - started)
+        if res.status_code != 429 or attempt == TMDB_MAX_429_RETRIES: return res
+        tmdb_rate_limiter.pause(retry_after_seconds(res))
+    return res
+
+# --- TMDb রেসপন্স ক্যাশ: প্রসেসের LRU + Mongo (tmdb_cache) কালেকশন, এন্ডপয়েন্ট অনুযায়ী TTL ---
+# "কোনো সার্চ রেজাল্ট নেই" / "কোনো ট্রেলার নেই" এর মতো নেগেটিভ উত্তরও ছোট TTL দিয়ে ক্যাশ হয়
+TMDB_CACHE_TTLS = {"search": timedelta(days=1), "details": timedelta(days=7)}
+TMDB_NEGATIVE_TTL = timedelta(hours=6)
+TMDB_MEMORY_CACHE_SIZE = int(os.getenv("TMDB_MEMORY_CACHE_SIZE", 1024))
+tmdb_memory_cache = OrderedDict() # key -> (expires_at, data)
+tmdb_memory_lock = threading.Lock()
+
+def find_trailer_key(video_res):
+    for v in video_res.get("results", []):
+        if v.get('type') == 'Trailer' and v.get('site') == 'YouTube': return v.get('key')
+    return None
+
+def tmdb_cache_ttl(path, data):
+    if path.startswith("search/"): return TMDB_CACHE_TTLS["search"] if data.get("results") else TMDB_NEGATIVE_TTL
+    if not data.get("id") or not find_trailer_key(data.get("videos") or {}): return TMDB_NEGATIVE_TTL
+    return TMDB_CACHE_TTLS["details"]
+
+def remember_tmdb_response(key, expires_at, data):
+    with tmdb_memory_lock:
+        tmdb_memory_cache[key] = (expires_at, data)
+        tmdb_memory_cache.move_to_end(key)
+        while len(tmdb_memory_cache) > TMDB_MEMORY_CACHE_SIZE: tmdb_memory_cache.popitem(last=False)
+
+def tmdb_get(path, **params):
+    key = f"{path}?{urlencode(sorted(params.items()))}" if params else path
+    now = datetime.utcnow()
+    with tmdb_memory_lock: cached = tmdb_memory_cache.get(key)
+    if cached and cached[0] > now: return cached[1]
+    stored = tmdb_cache.find_one({"_id": key, "expires_at": {"$gt": now}})
+    if stored:
+        remember_tmdb_response(key, stored["expires_at"], stored["data"])
+        return stored["data"]
+    res = tmdb_request(path, params)
+    # সার্ভার/অথ/রেট-লিমিট এর ত্রুটি ক্যাশ করা হয় না
+    if res.status_code >= 500 or res.status_code in (401, 429): res.raise_for_status()
+    data = res.json()
+    expires_at = now + tmdb_cache_ttl(path, data)
+    tmdb_cache.update_one({"_id": key}, {"$set": {"data": data, "expires_at": expires_at}}, upsert=True)
+    remember_tmdb_response(key, expires_at, data)
+    return data
+
+# একটি রিকোয়েস্টেই ডিটেইল ও ভিডিও (append_to_response); fetch_tmdb_fields এখান থেকেই ট্রেইলার কী ও বের করে (find_trailer_key)
+def get_tmdb_title(tmdb_id, tmdb_type):
+    return tmdb_get(f"{tmdb_type}/{tmdb_id}", append_to_response="videos")
+
+# TMDb থেকে শুধু ফাঁকা ফিল্ডগুলোর মান আনে (ডাটাবেসে লেখে না); TMDb ত্রুটিতে RequestException
+def fetch_tmdb_fields(movie_obj):
     tmdb_id = movie_obj.get("tmdb_id")
     tmdb_type = "tv" if movie_obj.get("type") == "series" else "movie"
     update_fields = {}
-    try:
-        if not tmdb_id:
-            search_url = f"https://api.themoviedb.org/3/search/{tmdb_type}?api_key={TMDB_API_KEY}&query={requests.utils.quote(movie_obj['title'])}"
-            search_res = requests.get(search_url, timeout=5).json()
-            if search_res.get("results"): tmdb_id = search_res["results"][0].get("id")
-        if tmdb_id:
-            detail_url = f"https://api.themoviedb.org/3/{tmdb_type}/{tmdb_id}?api_key={TMDB_API_KEY}"
-            res = requests.get(detail_url, timeout=5).json()
-            update_fields["tmdb_id"] = tmdb_id
-            if not movie_obj.get("poster") and res.get("poster_path"): update_fields["poster"] = f"https://image.tmdb.org/t/p/w500{res['poster_path']}"
-            if not movie_obj.get("overview") and res.get("overview"): update_fields["overview"] = res["overview"]
-            if not movie_obj.get("release_date"):
-                release_date = res.get("release_date") if tmdb_type == "movie" else res.get("first_air_date")
-                if release_date: update_fields["release_date"] = release_date
-            if not movie_obj.get("genres") and res.get("genres"): update_fields["genres"] = [g['name'] for g in res.get("genres", [])]
-            if not movie_obj.get("vote_average") and res.get("vote_average"): update_fields["vote_average"] = res.get("vote_average")
-            if len(update_fields) > 1:
-                movies.update_one({"_id": movie_obj["_id"]}, {"$set": update_fields})
-                movie_obj.update(update_fields)
-                print(f"Updated '{movie_obj['title']}' with TMDb data.")
-    except requests.RequestException as e: print(f"TMDb API error for '{movie_obj['title']}': {e}")
+    if not tmdb_id:
+        search_res = tmdb_get(f"search/{tmdb_type}", query=movie_obj['title'])
+        if search_res.get("results"): tmdb_id = search_res["results"][0].get("id")
+    if tmdb_id:
+        res = get_tmdb_title(tmdb_id, tmdb_type)
+        update_fields["tmdb_id"] = tmdb_id
+        if not movie_obj.get("poster") and res.get("poster_path"): update_fields["poster"] = f"https://image.tmdb.org/t/p/w500{res['poster_path']}"
+        if not movie_obj.get("overview") and res.get("overview"): update_fields["overview"] = res["overview"]
+        if not movie_obj.get("release_date"):
+            release_date = res.get("release_date") if tmdb_type == "movie" else res.get("first_air_date")
+            if release_date: update_fields["release_date"] = release_date
+        if not movie_obj.get("genres") and res.get("genres"): update_fields["genres"] = [g['name'] for g in res.get("genres", [])]
+        if not movie_obj.get("vote_average") and res.get("vote_average"): update_fields["vote_average"] = res.get("vote_average")
+        if not movie_obj.get("trailer_key"):
+            trailer_key = find_trailer_key(res.get("videos") or {})
+            if trailer_key: update_fields["trailer_key"] = trailer_key
+    return update_fields
+
+def get_tmdb_details(movie_obj):
+    if not TMDB_API_KEY: return movie_obj
+    try: update_fields = fetch_tmdb_fields(movie_obj)
+    except requests.RequestException as e:
+        print(f"TMDb API error for '{movie_obj['title']}': {e}")
+        return movie_obj
+    checked = {"tmdb_checked_at": datetime.utcnow()} # সফলভাবে দেখা হয়েছে, আবার কিউতে যাবে না
+    if len(update_fields) > 1:
+        movies.update_one({"_id": movie_obj["_id"]}, {"$set": {**update_fields, **checked}})
+        old_obj = dict(movie_obj)
+        movie_obj.update(update_fields, **checked)
+        catalog_changed(old_obj, movie_obj)
+        print(f"Updated '{movie_obj['title']}' with TMDb data.")
+    else:
+        movies.update_one({"_id": movie_obj["_id"]}, {"$set": checked})
+        movie_obj.update(checked)
     return movie_obj
 
-def get_trailer_key(tmdb_id, tmdb_type):
-    if not TMDB_API_KEY or not tmdb_id: return None
-    try:
-        video_url = f"https://api.themoviedb.org/3/{tmdb_type}/{tmdb_id}/videos?api_key={TMDB_API_KEY}"
-        video_res = requests.get(video_url, timeout=5).json()
-        for v in video_res.get("results", []):
-            if v['type'] == 'Trailer' and v['site'] == 'YouTube': return v['key']
-    except requests.RequestException: pass
-    return None
+# --- TMDb ব্যাকগ্রাউন্ড এনরিচমেন্ট: রিকোয়েস্টের পথে TMDb কল হয় না, কিউ থেকে worker থ্রেডগুলো কাজ করে ---
+TMDB_WORKERS = int(os.getenv("TMDB_WORKERS", 2))
+enrich_queue = queue.Queue(maxsize=1000)
+enrich_pending = set()
+enrich_lock = threading.Lock()
+enrich_state = {"pid": None}
+
+def needs_enrichment(movie_obj):
+    return bool(TMDB_API_KEY) and not movie_obj.get("tmdb_checked_at")
+
+def enrichment_worker():
+    while True:
+        movie_id = enrich_queue.get()
+        try:
+            movie_obj = movies.find_one({"_id": movie_id})
+            if movie_obj and needs_enrichment(movie_obj): get_tmdb_details(movie_obj)
+        except Exception as e: print(f"Enrichment error for {movie_id}: {e}")
+        finally:
+            with enrich_lock: enrich_pending.discard(movie_id)
+
+def queue_enrichment(movie_id):
+    if not TMDB_API_KEY: return
+    with enrich_lock:
+        # gunicorn fork এর পরে প্রতিটি worker প্রসেস নিজের থ্রেড চালু করে
+        if enrich_state["pid"] != os.getpid():
+            enrich_state["pid"] = os.getpid()
+            for _ in range(TMDB_WORKERS): threading.Thread(target=enrichment_worker, daemon=True).start()
+        if movie_id in enrich_pending: return
+        try: enrich_queue.put_nowait(movie_id)
+        except queue.Full: return # পরের ভিউতে আবার চেষ্টা হবে
+        enrich_pending.add(movie_id)
 
 def process_movie_list(movie_list):
     for item in movie_list:
         if '_id' in item: item['_id'] = str(item['_id'])
     return movie_list
 
+# লিস্ট/ক্যারোসেলের কার্ডে শুধু এই ফিল্ডগুলো লাগে; episodes, links, overview আনার দরকার নেই
+CARD_PROJECTION = {"title": 1, "poster": 1, "poster_badge": 1}
+HERO_PROJECTION = {**CARD_PROJECTION, "overview": 1, "watch_link": 1, "is_coming_soon": 1}
+
+# --- হোম পেজ ক্যাশ: সব ক্যারোসেল একটি $facet কোয়েরিতে, অ্যাডমিন পরিবর্তনে ক্যাশ মুছে যায় ---
+HOME_CAROUSEL_LIMIT = 12
+HOME_HERO_LIMIT = 6
+home_cache = {}
+
+def get_home_context():
+    context = home_cache.get("context")
+    if context is not None: return context
+    released = {"is_coming_soon": {"$ne": True}}
+    limit = HOME_CAROUSEL_LIMIT
+    card, hero = {"$project": CARD_PROJECTION}, {"$project": HERO_PROJECTION}
+    pipeline = [
+        {"$sort": {"_id": -1}},
+        {"$facet": {
+            "trending_movies": [{"$match": {"is_trending": True, **released}}, {"$limit": limit}, card],
+            "latest_movies": [{"$match": {"type": "movie", **released}}, {"$limit": limit}, card],
+            "latest_series": [{"$match": {"type": "series", **released}}, {"$limit": limit}, card],
+            "coming_soon_movies": [{"$match": {"is_coming_soon": True}}, {"$limit": limit}, card],
+            "recently_added_full": [{"$match": released}, {"$limit": limit}, hero] # hero slider এও ব্যবহার হয়
+        }}
+    ]
+    result = next(movies.aggregate(pipeline), {})
+    context = {key: process_movie_list(result.get(key, [])) for key in ("trending_movies", "latest_movies", "latest_series", "coming_soon_movies", "recently_added_full")}
+    context["recently_added"] = context["recently_added_full"][:HOME_HERO_LIMIT] # For hero slider
+    context["all_badges"] = [badge["name"] for badge in get_facets("badge")]
+    context.update({"is_full_page_list": False, "query": ""})
+    home_cache["context"] = context
+    return context
+
+# --- পেজ ক্যাশ: এন্ডপয়েন্ট ও কুয়েরি আর্গুমেন্ট অনুযায়ী রেন্ডার করা পেজ (LRU), ট্যাগ ধরে মুছে ফেলা হয় ---
+PAGE_CACHE_SIZE = int(os.getenv("PAGE_CACHE_SIZE", 512))
+page_cache = OrderedDict() # key -> (body, mimetype, tags, compressed variants)
+page_cache_tags = {} # tag -> set of keys
+page_cache_state = {"generation": 0}
+page_cache_lock = threading.Lock()
+
+def cache_tag(*tags):
+    if "cache_tags" not in g: g.cache_tags = set()
+    g.cache_tags.update(tags)
+
+def _drop_page(key):
+    entry = page_cache.pop(key, None)
+    if entry is None: return
+    for tag in entry[2]:
+        keys = page_cache_tags.get(tag)
+        if keys is None: continue
+        keys.discard(key)
+        if not keys: del page_cache_tags[tag]
+
+def invalidate_pages(tags):
+    with page_cache_lock:
+        page_cache_state["generation"] += 1
+        for tag in tags:
+            for key in list(page_cache_tags.get(tag, ())): _drop_page(key)
+
+def clear_page_cache():
+    with page_cache_lock:
+        page_cache_state["generation"] += 1
+        page_cache.clear()
+        page_cache_tags.clear()
+
+# --- ক্যাটালগ ভার্সন: movies এ প্রতিটি লেখায় meta কালেকশনে version বাড়ে ---
+# পাবলিক পেজের ETag/Last-Modified এটি থেকে আসে; অন্য worker CATALOG_VERSION_TTL সেকেন্ডের মধ্যে নতুন ভার্সন দেখে নিজের ক্যাশ মুছে ফেলে
+CATALOG_VERSION_TTL = int(os.getenv("CATALOG_VERSION_TTL", 5))
+catalog_state = {"version": None, "updated_at": None, "checked_at": 0}
+catalog_state_lock = threading.Lock()
+
+try: meta.update_one({"_id": "catalog"}, {"$setOnInsert": {"version": 0, "updated_at": datetime.utcnow().replace(microsecond=0)}}, upsert=True)
+except PyMongoError as e: print(f"Warning: could not initialise the catalog version: {e}")
+
+# এই প্রসেসের মেমোরিতে থাকা সব ক্যাটালগ-নির্ভর ক্যাশ; পরের রিকোয়েস্টে ডাটাবেস থেকে আবার তৈরি হয়
+def reset_local_caches():
+    home_cache.clear()
+    clear_page_cache()
+    title_index.reset()
+
+def set_catalog_state(doc, expected=None):
+    with catalog_state_lock:
+        known = catalog_state["version"]
+        catalog_state.update(version=doc.get("version", 0), updated_at=doc.get("updated_at"), checked_at=time.monotonic())
+    # মাঝে অন্য worker এর কোনো পরিবর্তন এই প্রসেস দেখেনি
+    if known is not None and catalog_state["version"] != (known if expected is None else expected(known)): reset_local_caches()
+
+def get_catalog_version():
+    if catalog_state["version"] is None or time.monotonic() - catalog_state["checked_at"] >= CATALOG_VERSION_TTL:
+        set_catalog_state(meta.find_one({"_id": "catalog"}) or {})
+    return catalog_state["version"], catalog_state["updated_at"]
+
+def bump_catalog_version():
+    doc = meta.find_one_and_update({"_id": "catalog"}, {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow().replace(microsecond=0)}},
+                                   upsert=True, return_document=ReturnDocument.AFTER)
+    set_catalog_state(doc, expected=lambda known: known + 1)
+
+# ক্যাটালগ, বিজ্ঞাপন আর ডিপ্লয় (টেমপ্লেট/অ্যাসেট) — এর বাইরে পাবলিক পেজ কিছুর উপর নির্ভর করে না
+def page_validators():
+    version, updated_at = get_catalog_version()
+    ads = get_ad_settings()
+    last_modified = max(date for date in (updated_at, ads.get("updated_at"), datetime(2000, 1, 1)) if date)
+    return f"c{version}-a{ads.get('version', 0)}-{PAGE_BUILD}", last_modified
+
+def set_validators(response, etag, last_modified, tags=None):
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    response.headers["Cache-Control"] = "public, no-cache" # প্রতিবার যাচাই, কিছু না বদলালে শুধু 304
+    if tags is not None:
+        # "all": বিজ্ঞাপন বা বাল্ক ইমপোর্টের মতো সব পেজ বদলানো পরিবর্তনের জন্য
+        response.headers["Surrogate-Key"] = " ".join(sorted(surrogate_key(tag) for tag in tags | {"all"}))
+        if PURGE_URL: response.headers["Surrogate-Control"] = f"max-age={SURROGATE_MAX_AGE}"
+    return response
+
+# --- এজ ক্যাশ (রিভার্স প্রক্সি/CDN): প্রতিটি পেজে Surrogate-Key হেডারে তার ক্যাশ ট্যাগ, অ্যাডমিন পরিবর্তনে ঠিক সেই কী গুলো purge ---
+# PURGE_URL এ POST যায়, হেডার "Surrogate-Key: movie:<id> genre:Action ..." (Fastly/Varnish xkey ধরন); PURGE_TOKEN থাকলে Bearer টোকেন
+# PURGE_URL না থাকলে প্রক্সিকে লম্বা সময় ক্যাশ রাখতে বলা হয় না, কারণ তখন পুরনো পেজ মোছার কোনো উপায় নেই
+PURGE_URL = os.getenv("PURGE_URL")
+PURGE_TOKEN = os.getenv("PURGE_TOKEN")
+SURROGATE_MAX_AGE = int(os.getenv("SURROGATE_MAX_AGE", 86400))
+PURGE_BATCH_KEYS = 256
+PURGE_ATTEMPTS = 3
+PURGE_RETRY_DELAY = 1 # সেকেন্ড, প্রতি চেষ্টায় দ্বিগুণ; শেষ চেষ্টার পরে অপেক্ষা নেই
+purge_queue = queue.Queue()
+purge_state = {"pid": None}
+purge_lock = threading.Lock()
+
+# জনরা/ব্যাজের নামে স্পেস থাকতে পারে, হেডারে কী গুলো স্পেস দিয়ে আলাদা হয়
+def surrogate_key(tag):
+    return quote(tag, safe=":")
+
+def send_purge(keys):
+    headers = {"Surrogate-Key": " ".join(keys)}
+    if PURGE_TOKEN: headers["Authorization"] = f"Bearer {PURGE_TOKEN}"
+    for attempt in range(PURGE_ATTEMPTS):
+        try:
+            response = requests.post(PURGE_URL, headers=headers, timeout=10)
+            if response.status_code < 500:
+                if not response.ok: print(f"Purge rejected ({response.status_code}) for {len(keys)} keys")
+                return
+        except requests.RequestException as e: print(f"Purge error: {e}")
+        if attempt < PURGE_ATTEMPTS - 1: time.sleep(PURGE_RETRY_DELAY * 2 ** attempt)
+    print(f"Purge failed for {len(keys)} keys: {' '.join(keys)[:200]}")
+
+# একসাথে জমে থাকা সব purge একটি (বা PURGE_BATCH_KEYS করে কয়েকটি) রিকোয়েস্টে যায়
+def send_queued_purges(first):
+    keys, taken = set(first), 1
+    while True:
+        try: keys.update(purge_queue.get_nowait())
+        except queue.Empty: break
+        taken += 1
+    keys = sorted(keys)
+    try:
+        for i in range(0, len(keys), PURGE_BATCH_KEYS): send_purge(keys[i:i + PURGE_BATCH_KEYS])
+    finally:
+        for _ in range(taken): purge_queue.task_done()
+
+def purge_worker():
+    while True: send_queued_purges(purge_queue.get())
+
+# বাকি purge এখনই পাঠায় ও ওয়ার্কারের চলতি ব্যাচের অপেক্ষা করে; atexit এ চলে, নাহলে CLI import/backfill এর purge হারিয়ে যেত
+def flush_purges():
+    try: send_queued_purges(purge_queue.get_nowait())
+    except queue.Empty: pass
+    purge_queue.join()
+
+atexit.register(flush_purges)
+
+def purge_pages(tags):
+    if not PURGE_URL or not tags: return
+    with purge_lock:
+        if purge_state["pid"] != os.getpid():
+            purge_state["pid"] = os.getpid()
+            threading.Thread(target=purge_worker, daemon=True).start()
+    purge_queue.put([surrogate_key(tag) for tag in tags])
+
+# ক্যাশ কী তে শুধু ক্যাশ করা ভিউগুলো যে প্যারামিটার পড়ে, ভিউয়ের মতোই স্বাভাবিক করে; ?x=<random> নতুন এন্ট্রি বানায় না
+PAGE_CACHE_ARGS = ("q", "value", "fields", "after")
+
+def page_cache_args():
+    args = tuple((name, request.args.get(name)) for name in PAGE_CACHE_ARGS if name in request.args)
+    page = max(request.args.get("page", 1, type=int), 1)
+    limit = min(max(request.args.get("limit", LIST_PAGE_SIZE, type=int), 1), LIST_PAGE_MAX)
+    return args + (("page", page), ("limit", limit))
+
+def cached_page(view):
+    @wraps(view)
+    def decorated(*args, **kwargs):
+        etag, last_modified = page_validators()
+        if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+            response = set_validators(Response(status=304), etag, last_modified)
+            response.vary.add("Accept-Encoding")
+            return response
+        key = (request.endpoint, tuple(sorted(kwargs.items())), page_cache_args())
+        with page_cache_lock:
+            entry = page_cache.get(key)
+            if entry is not None: page_cache.move_to_end(key)
+            generation = page_cache_state["generation"]
+        if entry is not None: return set_validators(encoded_response(entry[0], entry[1], entry[3], negotiate_encoding()), etag, last_modified, entry[2])
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code != 200 or g.get("cache_skip"): return response
+        tags = frozenset(g.get("cache_tags", ()))
+        with page_cache_lock:
+            # রেন্ডারের মাঝে কোনো অ্যাডমিন পরিবর্তন হলে এই পেজটি পুরনো, তাই ক্যাশ করা হবে না
+            if generation != page_cache_state["generation"]: return response # ETag ছাড়াই, যাতে পুরনো ভার্সনের সাথে না মেলে
+            _drop_page(key)
+            entry = page_cache[key] = (response.get_data(), response.mimetype, tags, {})
+            for tag in tags: page_cache_tags.setdefault(tag, set()).add(key)
+            while len(page_cache) > PAGE_CACHE_SIZE: _drop_page(next(iter(page_cache)))
+        return set_validators(encoded_response(entry[0], entry[1], entry[3], negotiate_encoding()), etag, last_modified, tags)
+    return decorated
+
+# একটি কনটেন্ট কোন কোন পেজে দেখা যায়
+def movie_cache_tags(movie):
+    if not movie: return set()
+    tags = {"home", "search", f"movie:{movie['_id']}"}
+    tags.update(f"genre:{genre}" for genre in movie.get("genres") or [])
+    if movie.get("poster_badge"): tags.add(f"badge:{movie['poster_badge']}")
+    if movie.get("is_coming_soon"): tags.add("list:coming_soon")
+    else:
+        tags.add("list:recent")
+        if movie.get("is_trending"): tags.add("list:trending")
+        if movie.get("type") == "movie": tags.add("list:movies")
+        elif movie.get("type") == "series": tags.add("list:series")
+    return tags
+
+# --- টাইটেল সার্চ ইনডেক্স: নরমালাইজড টাইটেল টোকেনের ইনভার্টেড ইনডেক্স, প্রসেসের মেমোরিতে থাকে ---
+# অক্ষর, সংখ্যা ও মাত্রা/কার-চিহ্ন (M) টোকেনের অংশ, বাকি সব বিভাজক — বাংলা টাইটেলও ঠিকমতো ভাঙে
+def title_tokens(text):
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return "".join(ch if unicodedata.category(ch)[0] in "LNM" else " " for ch in text).split()
+
+class TitleIndex:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.built = False
+        self.cards = {} # id -> card fields
+        self.tokens = {} # id -> title tokens
+        self.titles = {} # id -> normalized title (tokens joined)
+        self.postings = {} # token -> set of ids
+        self.vocabulary = None # sorted tokens for prefix lookup, None = needs re-sorting
+        self.prefixes = [] # sorted (title from n-th word, id), typeahead এর জন্য
+
+    def ensure_built(self):
+        if self.built: return
+        with self.lock:
+            if self.built: return
+            for movie in movies.find({}, CARD_PROJECTION): self._add(movie)
+            self.prefixes.sort()
+            self.built = True
+
+    def _add(self, movie):
+        movie_id = str(movie["_id"])
+        self._remove(movie_id)
+        self.cards[movie_id] = {"_id": movie_id, "title": movie.get("title") or "", "poster": movie.get("poster"), "poster_badge": movie.get("poster_badge")}
+        self.tokens[movie_id] = title_tokens(movie.get("title"))
+        self.titles[movie_id] = " ".join(self.tokens[movie_id])
+        for entry in self._prefix_entries(movie_id):
+            if self.built: bisect.insort(self.prefixes, entry)
+            else: self.prefixes.append(entry)
+        for token in set(self.tokens[movie_id]):
+            if token not in self.postings: self.postings[token], self.vocabulary = set(), None
+            self.postings[token].add(movie_id)
+
+    def _remove(self, movie_id):
+        for entry in self._prefix_entries(movie_id):
+            i = bisect.bisect_left(self.prefixes, entry)
+            if i < len(self.prefixes) and self.prefixes[i] == entry: del self.prefixes[i]
+        self.cards.pop(movie_id, None)
+        self.titles.pop(movie_id, None)
+        for token in set(self.tokens.pop(movie_id, ())):
+            self.postings[token].discard(movie_id)
+            if not self.postings[token]: del self.postings[token]; self.vocabulary = None
+
+    # বাল্ক ইমপোর্টের পরে পুরো ইনডেক্স বাদ দেওয়া হয়, পরের সার্চে ডাটাবেস থেকে আবার তৈরি হয়
+    def reset(self):
+        with self.lock:
+            self.built, self.vocabulary = False, None
+            for structure in (self.cards, self.tokens, self.titles, self.postings, self.prefixes): structure.clear()
+
+    # অ্যাডমিন পরিবর্তনের পরে ইনডেক্স প্যাচ করা হয়; এখনো তৈরি না হলে পরে ডাটাবেস থেকেই নতুন ডেটা আসবে
+    def update(self, old=None, new=None):
+        with self.lock:
+            if not self.built: return
+            if new: self._add(new)
+            elif old: self._remove(str(old["_id"]))
+
+    # "the dark knight" -> "the dark knight", "dark knight", "knight": যেকোনো শব্দের শুরু থেকে টাইপ করলেও মিলবে
+    def _prefix_entries(self, movie_id):
+        tokens = self.tokens.get(movie_id, ())
+        return [(" ".join(tokens[i:]), movie_id) for i in range(len(tokens))]
+
+    def _terms(self, token):
+        if self.vocabulary is None: self.vocabulary = sorted(self.postings)
+        for i in range(bisect.bisect_left(self.vocabulary, token), len(self.vocabulary)):
+            if not self.vocabulary[i].startswith(token): break
+            yield self.vocabulary[i]
+
+    # র‍্যাঙ্কিং: বেশি টোকেন মিলেছে > পুরো টোকেন মিল (২) প্রিফিক্স মিলের (১) চেয়ে ভালো > টাইটেল কুয়েরি দিয়ে শুরু > নতুন কনটেন্ট
+    def search(self, query, limit, match_all=False):
+        self.ensure_built()
+        query_tokens = title_tokens(query)
+        if not query_tokens: return []
+        phrase = " ".join(query_tokens)
+        with self.lock:
+            scores = {}
+            for token in dict.fromkeys(query_tokens):
+                best = {}
+                for term in self._terms(token):
+                    weight = 2 if term == token else 1
+                    for movie_id in self.postings[term]:
+                        if best.get(movie_id, 0) < weight: best[movie_id] = weight
+                for movie_id, weight in best.items():
+                    matched, score = scores.get(movie_id, (0, 0))
+                    scores[movie_id] = (matched + 1, score + weight)
+            if match_all: scores = {movie_id: value for movie_id, value in scores.items() if value[0] == len(set(query_tokens))}
+            def rank(movie_id):
+                matched, score = scores[movie_id]
+                title = self.titles[movie_id]
+                if title == phrase: score += 5
+                elif title.startswith(phrase): score += 3
+                return (-matched, -score, -int(movie_id, 16))
+            return [self.cards[movie_id] for movie_id in heapq.nsmallest(limit, scores, key=rank)]
+
+    # সাজানো অ্যারেতে bisect; সর্বোচ্চ SUGGEST_SCAN টি মিল দেখে টাইটেলের শুরুতে মেলা ও ছোট টাইটেল আগে
+    def suggest(self, query, limit):
+        self.ensure_built()
+        phrase = " ".join(title_tokens(query))
+        if not phrase: return []
+        with self.lock:
+            best = {}
+            start = bisect.bisect_left(self.prefixes, (phrase,))
+            for suffix, movie_id in self.prefixes[start:start + SUGGEST_SCAN]:
+                if not suffix.startswith(phrase): break
+                rank = (suffix != self.titles[movie_id], len(self.titles[movie_id]), suffix)
+                if movie_id not in best or rank < best[movie_id]: best[movie_id] = rank
+            return [self.cards[movie_id] for movie_id in heapq.nsmallest(limit, best, key=best.get)]
+
+SUGGEST_LIMIT = 8
+SUGGEST_SCAN = 200
+title_index = TitleIndex()
+
+# --- জনরা ও ব্যাজ ফ্যাসেট: facets কালেকশনে প্রতিটির টাইটেল সংখ্যা ও একটি পোস্টার, অ্যাডমিন লেখায় ইনক্রিমেন্টালি আপডেট হয় ---
+# ডকুমেন্ট: {"_id": "genre:Action", "kind": "genre", "name": "Action", "count": 12, "poster": "..."}
+def facet_keys(movie):
+    if not movie: return set()
+    keys = {("genre", genre) for genre in movie.get("genres") or [] if genre}
+    if movie.get("poster_badge"): keys.add(("badge", movie["poster_badge"]))
+    return keys
+
+def facet_query(kind, name):
+    return {"genres": name} if kind == "genre" else {"poster_badge": name}
+
+def get_facets(kind):
+    return list(facets.find({"kind": kind, "count": {"$gt": 0}}, {"_id": 0}).sort("name", 1))
+
+def update_facets(old=None, new=None):
+    old_keys, new_keys = facet_keys(old), facet_keys(new)
+    removed, added = old_keys - new_keys, new_keys - old_keys
+    poster = (new or {}).get("poster")
+    operations = [UpdateOne({"_id": f"{kind}:{name}"}, {"$inc": {"count": -1}}) for kind, name in removed]
+    for kind, name in added:
+        operations.append(UpdateOne({"_id": f"{kind}:{name}"}, {"$inc": {"count": 1}, "$set": {"kind": kind, "name": name}}, upsert=True))
+    # পোস্টারহীন ফ্যাসেট এই টাইটেলের পোস্টার পায়; সেগুলোর টাইলও বদলায়, তাই touched এ যায়
+    filled = set()
+    if poster and new_keys - added:
+        empty = facets.find({"_id": {"$in": [f"{kind}:{name}" for kind, name in new_keys - added]}, "poster": {"$in": [None, ""]}}, {"kind": 1, "name": 1})
+        filled = {(facet["kind"], facet["name"]) for facet in empty}
+    for kind, name in new_keys if poster else ():
+        operations.append(UpdateOne({"_id": f"{kind}:{name}", "poster": {"$in": [None, ""]}}, {"$set": {"poster": poster}}))
+    if operations: facets.bulk_write(operations)
+    facets.delete_many({"_id": {"$in": [f"{kind}:{name}" for kind, name in removed]}, "count": {"$lte": 0}})
+    # এই টাইটেলের পুরনো পোস্টার যে ফ্যাসেটে প্রতিনিধি ছিল, সেখানে সর্বশেষ অন্য একটি পোস্টার বসে
+    touched = removed | added | filled
+    old_poster = (old or {}).get("poster")
+    if old_poster and old_poster != poster:
+        for kind, name in old_keys:
+            if not facets.find_one({"_id": f"{kind}:{name}", "poster": old_poster}, {"_id": 1}): continue
+            latest = movies.find_one({**facet_query(kind, name), "poster": {"$nin": [None, "", old_poster]}}, {"poster": 1}, sort=[("_id", -1)])
+            facets.update_one({"_id": f"{kind}:{name}"}, {"$set": {"poster": latest["poster"] if latest else None}})
+            touched.add((kind, name))
+    return touched
+
+# পুরো movies কালেকশন থেকে নতুন করে গণনা (প্রথম চালু হলে বা python bot.py rebuild-facets দিয়ে)
+def rebuild_facets():
+    counts, posters = {}, {}
+    for movie in movies.find({}, {"genres": 1, "poster_badge": 1, "poster": 1}).sort("_id", -1):
+        for key in facet_keys(movie):
+            counts[key] = counts.get(key, 0) + 1
+            if movie.get("poster") and key not in posters: posters[key] = movie["poster"]
+    operations = [ReplaceOne({"_id": f"{kind}:{name}"}, {"kind": kind, "name": name, "count": count, "poster": posters.get((kind, name))}, upsert=True)
+                  for (kind, name), count in counts.items()]
+    if operations: facets.bulk_write(operations, ordered=False)
+    facets.delete_many({"_id": {"$nin": [f"{kind}:{name}" for kind, name in counts]}})
+    return len(operations)
+
+try:
+    if facets.estimated_document_count() == 0 and movies.estimated_document_count() > 0: rebuild_facets()
+except PyMongoError as e: print(f"Warning: could not build genre/badge facets: {e}")
+
+# --- সম্পর্কিত টাইটেল: প্রতিটি ডকুমেন্টে আগে থেকে হিসাব করা সেরা RELATED_LIMIT টি প্রতিবেশী ("related": [{"_id", "score"}]) ---
+# স্কোর: জনরা মিল (Jaccard x3) + একই ব্যাজ (১) + একই টাইপ (০.৫) + রিলিজ বছরের কাছাকাছি (সর্বোচ্চ ১)
+RELATED_LIMIT = 12
+RELATED_FIELDS = {"genres": 1, "poster_badge": 1, "type": 1, "release_date": 1, "related": 1}
+
+def release_year(movie):
+    year = (movie.get("release_date") or "")[:4]
+    return int(year) if year.isdigit() else None
+
+def related_score(movie, other):
+    genres, other_genres = set(movie.get("genres") or []), set(other.get("genres") or [])
+    if not genres & other_genres: return 0
+    score = 3 * len(genres & other_genres) / len(genres | other_genres)
+    if movie.get("poster_badge") and movie.get("poster_badge") == other.get("poster_badge"): score += 1
+    if movie.get("type") == other.get("type"): score += 0.5
+    year, other_year = release_year(movie), release_year(other)
+    if year and other_year: score += 1 / (1 + abs(year - other_year))
+    return round(score, 4)
+
+def top_related(movie, candidates):
+    scored = ((related_score(movie, other), other["_id"]) for other in candidates if other["_id"] != movie["_id"])
+    return [{"_id": movie_id, "score": score} for score, movie_id in heapq.nlargest(RELATED_LIMIT, (item for item in scored if item[0] > 0))]
+
+# একটি টাইটেল বদলালে: তার নিজের তালিকা নতুন করে, আর যাদের তালিকায় সে ঢুকতে/বেরোতে পারে শুধু তাদেরটা প্যাচ করা হয়
+def update_related(old=None, new=None):
+    movie_id = (new or old)["_id"]
+    if not new:
+        movies.update_many({"related._id": movie_id}, {"$pull": {"related": {"_id": movie_id}}})
+        return
+    query = {"$or": [{"related._id": movie_id}] + ([{"genres": {"$in": new["genres"]}}] if new.get("genres") else []), "_id": {"$ne": movie_id}}
+    candidates = list(movies.find(query, RELATED_FIELDS))
+    operations = [UpdateOne({"_id": movie_id}, {"$set": {"related": top_related(new, candidates)}})]
+    for other in candidates:
+        current = [item for item in other.get("related") or [] if item["_id"] != movie_id]
+        score = related_score(other, new)
+        if score > 0: current.append({"_id": movie_id, "score": score})
+        current = sorted(current, key=lambda item: item["score"], reverse=True)[:RELATED_LIMIT]
+        if current != (other.get("related") or []): operations.append(UpdateOne({"_id": other["_id"]}, {"$set": {"related": current}}))
+    movies.bulk_write(operations, ordered=False)
+
+# পুরো ক্যাটালগের জন্য অফলাইন হিসাব: python bot.py build-related
+def build_related(batch_size=500):
+    catalog = list(movies.find({}, {"genres": 1, "poster_badge": 1, "type": 1, "release_date": 1}))
+    by_genre = {}
+    for movie in catalog:
+        for genre in set(movie.get("genres") or []): by_genre.setdefault(genre, []).append(movie)
+    operations = []
+    for movie in catalog:
+        candidates = {other["_id"]: other for genre in set(movie.get("genres") or []) for other in by_genre[genre]}
+        operations.append(UpdateOne({"_id": movie["_id"]}, {"$set": {"related": top_related(movie, candidates.values())}}))
+        if len(operations) >= batch_size:
+            movies.bulk_write(operations, ordered=False)
+            operations = []
+    if operations: movies.bulk_write(operations, ordered=False)
+    return len(catalog)
+
+# movies কালেকশনে যেকোনো লেখার পরে এটি কল করতে হবে (আগের ও পরের ডকুমেন্ট সহ), যাতে ক্যাশ করা ডেটা পুরনো না থাকে
+def catalog_changed(old=None, new=None):
+    if not old and not new: return # যেমন আগেই মুছে যাওয়া আইডি আবার ডিলিট করা: কিছুই বদলায়নি
+    bump_catalog_version()
+    home_cache.clear()
+    tags = movie_cache_tags(old) | movie_cache_tags(new)
+    if any(kind == "genre" for kind, name in update_facets(old, new)): tags.add("genres")
+    update_related(old, new)
+    invalidate_pages(tags)
+    purge_pages(tags)
+    title_index.update(old, new)
+
 @app.route('/')
+@cached_page
 def home():
     query = request.args.get('q')
     if query:
-        movies_list = list(movies.find({"title": {"$regex": query, "$options": "i"}}).sort('_id', -1))
-        return render_template_string(index_html, movies=process_movie_list(movies_list), query=f'Results for "{query}"', is_full_page_list=True)
-    
-    all_badges = movies.distinct("poster_badge")
-    all_badges = sorted([badge for badge in all_badges if badge])
-
-    limit = 12 # MODIFIED: Changed from 18 to 12
-    context = {
-        "trending_movies": process_movie_list(list(movies.find({"is_trending": True, "is_coming_soon": {"$ne": True}}).sort('_id', -1).limit(limit))),
-        "latest_movies": process_movie_list(list(movies.find({"type": "movie", "is_coming_soon": {"$ne": True}}).sort('_id', -1).limit(limit))),
-        "latest_series": process_movie_list(list(movies.find({"type": "series", "is_coming_soon": {"$ne": True}}).sort('_id', -1).limit(limit))),
-        "coming_soon_movies": process_movie_list(list(movies.find({"is_coming_soon": True}).sort('_id', -1).limit(limit))),
-        "recently_added": process_movie_list(list(movies.find({"is_coming_soon": {"$ne": True}}).sort('_id', -1).limit(6))), # For hero slider
-        "recently_added_full": process_movie_list(list(movies.find({"is_coming_soon": {"$ne": True}}).sort('_id', -1).limit(limit))), # For carousel
-        "is_full_page_list": False, "query": "", "all_badges": all_badges
-    }
-    return render_template_string(index_html, **context)
+        results, next_page = search_page(query)
+        next_page_url = url_for('home', q=query, page=next_page) if next_page else None
+        next_fragment_url = url_for('search_fragment', q=query, page=next_page) if next_page else None
+        return render_template("index.html", movies=results, query=f'Results for "{query}"', is_full_page_list=True,
+                               next_page_url=next_page_url, next_fragment_url=next_fragment_url)
+    cache_tag("home")
+    return render_template("index.html", **get_home_context())
+
+def search_page(query):
+    cache_tag("search")
+    page = max(request.args.get("page", 1, type=int), 1)
+    results = title_index.search(query, page * LIST_PAGE_SIZE + 1)
+    next_page = page + 1 if len(results) > page * LIST_PAGE_SIZE else None
+    return results[(page - 1) * LIST_PAGE_SIZE:page * LIST_PAGE_SIZE], next_page
+
+@app.route('/api/search')
+@cached_page
+def search_fragment():
+    query = request.args.get('q', '')
+    results, next_page = search_page(query)
+    next_url = url_for('search_fragment', q=query, page=next_page) if next_page else None
+    return jsonify(html=render_template("cards.html", movies=results), next=next_url)
+
+@app.route('/api/suggest')
+def suggest():
+    get_catalog_version() # অন্য worker এর পরিবর্তন দেখা গেলে title_index রিসেট হয় (TTL ক্যাশ, সস্তা)
+    limit = min(max(request.args.get("limit", SUGGEST_LIMIT, type=int), 1), 20)
+    results = title_index.suggest(request.args.get('q', ''), limit)
+    return jsonify(results=[{"_id": m["_id"], "title": m["title"], "poster": poster_url(m, "w185"), "url": url_for('movie_detail', movie_id=m["_id"])} for m in results])
 
 @app.route('/movie/<movie_id>')
+@cached_page
 def movie_detail(movie_id):
     try:
         movie_obj = movies.find_one({"_id": ObjectId(movie_id)})
         if not movie_obj: return "Content not found", 404
         
-        movie = get_tmdb_details(dict(movie_obj))
+        if needs_enrichment(movie_obj): queue_enrichment(movie_obj["_id"])
+        movie = dict(movie_obj)
         movie['_id'] = str(movie['_id'])
         
         related_movies = []
-        if movie.get("genres"):
-            related_movies = list(movies.find({"genres": {"$in": movie["genres"]}, "_id": {"$ne": ObjectId(movie_id)}}).limit(12))
+        if movie.get("related"): # আগে থেকে হিসাব করা তালিকা: শুধু _id দিয়ে একটি লুকআপ
+            related_ids = [item["_id"] for item in movie["related"]]
+            by_id = {m["_id"]: m for m in movies.find({"_id": {"$in": related_ids}}, CARD_PROJECTION)}
+            related_movies = [by_id[related_id] for related_id in related_ids if related_id in by_id]
+        elif movie.get("genres"):
+            related_movies = list(movies.find({"genres": {"$in": movie["genres"]}, "_id": {"$ne": ObjectId(movie_id)}}, CARD_PROJECTION).limit(12))
+        cache_tag(*(f"genre:{genre}" for genre in movie.get("genres") or []))
         if not related_movies:
-            related_movies = list(movies.find({"_id": {"$ne": ObjectId(movie_id)}, "is_coming_soon": {"$ne": True}}).sort("_id", -1).limit(12))
+            related_movies = list(movies.find({"_id": {"$ne": ObjectId(movie_id)}, "is_coming_soon": {"$ne": True}}, CARD_PROJECTION).sort("_id", -1).limit(12))
+            cache_tag("list:recent")
+        cache_tag(f"movie:{movie_id}", *(f"movie:{m['_id']}" for m in related_movies))
 
-        trailer_key = get_trailer_key(movie.get("tmdb_id"), "tv" if movie.get("type") == "series" else "movie")
-        
-        return render_template_string(detail_html, movie=movie, trailer_key=trailer_key, related_movies=process_movie_list(related_movies))
+        return render_template("detail.html", movie=movie, trailer_key=movie.get("trailer_key"), related_movies=process_movie_list(related_movies))
     except Exception as e:
         print(f"Error in movie_detail: {e}")
-        return render_template_string(detail_html, movie=None, trailer_key=None, related_movies=[])
+        g.cache_skip = True
+        return render_template("detail.html", movie=None, trailer_key=None, related_movies=[])
 
 @app.route('/watch/<movie_id>')
 def watch_movie(movie_id):
@@ -943,69 +2056,225 @@ def watch_movie(movie_id):
                 if str(ep.get('episode_number')) == episode_num:
                     watch_link, title = ep.get('watch_link'), f"{title} - E{episode_num}: {ep.get('title')}"
                     break
-        if watch_link: return render_template_string(watch_html, watch_link=watch_link, title=title)
+        if watch_link: return render_template("watch.html", watch_link=watch_link, title=title)
         return "Watch link not found for this content.", 404
     except Exception as e:
         print(f"Watch page error: {e}")
         return "An error occurred.", 500
 
+# --- ফিডব্যাক বাফার: সাবমিশন মেমোরির কিউতে জমা হয়, ব্যাকগ্রাউন্ড থ্রেড insert_many দিয়ে ব্যাচে লেখে ---
+FEEDBACK_BUFFER_SIZE = 1000
+FEEDBACK_BATCH_SIZE = 100
+FEEDBACK_FLUSH_SECONDS = 2
+# প্রতি IP তে FEEDBACK_RATE_WINDOW সেকেন্ডে সর্বোচ্চ FEEDBACK_RATE_LIMIT টি বার্তা (স্লাইডিং উইন্ডো)
+FEEDBACK_RATE_LIMIT = int(os.getenv("FEEDBACK_RATE_LIMIT", 5))
+FEEDBACK_RATE_WINDOW = int(os.getenv("FEEDBACK_RATE_WINDOW", 600))
+feedback_buffer = queue.Queue(maxsize=FEEDBACK_BUFFER_SIZE)
+feedback_wakeup = threading.Event()
+feedback_flush_lock = threading.Lock()
+feedback_hits = {} # ip -> deque of submission times
+feedback_hits_lock = threading.Lock()
+feedback_state = {"pid": None}
+feedback_state_lock = threading.Lock()
+
+def allow_feedback(client_ip):
+    now = time.monotonic()
+    with feedback_hits_lock:
+        if len(feedback_hits) > 10000: # পুরনো IP গুলো ঝেড়ে ফেলা
+            for ip in [ip for ip, hits in feedback_hits.items() if now - hits[-1] > FEEDBACK_RATE_WINDOW]: del feedback_hits[ip]
+        hits = feedback_hits.setdefault(client_ip, deque())
+        while hits and now - hits[0] > FEEDBACK_RATE_WINDOW: hits.popleft()
+        if len(hits) >= FEEDBACK_RATE_LIMIT: return False
+        hits.append(now)
+        return True
+
+def requeue_feedback(items):
+    for i, item in enumerate(items):
+        try: feedback_buffer.put_nowait(item)
+        except queue.Full:
+            print(f"Feedback buffer full; dropped {len(items) - i} unsaved messages")
+            return
+
+# কিউতে থাকা সব বার্তা লেখে; শাটডাউনের সময়ও (atexit) এটিই চলে
+def flush_feedback():
+    with feedback_flush_lock:
+        while True:
+            batch = []
+            while len(batch) < FEEDBACK_BATCH_SIZE:
+                try: batch.append(feedback_buffer.get_nowait())
+                except queue.Empty: break
+            if not batch: return
+            try: feedback.insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                # insert_many আগেই _id বসিয়ে দেয়; 11000 মানে আগের আধা-সফল চেষ্টায় বার্তাটি লেখা হয়ে গেছে
+                failed = [batch[error["index"]] for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+                if not failed: continue
+                print(f"Error saving {len(failed)} of {len(batch)} feedback messages: {e}")
+                requeue_feedback(failed)
+                return
+            except PyMongoError as e:
+                print(f"Error saving {len(batch)} feedback messages: {e}")
+                requeue_feedback(batch)
+                return
+
+def feedback_flusher():
+    while True:
+        feedback_wakeup.wait(FEEDBACK_FLUSH_SECONDS)
+        feedback_wakeup.clear()
+        flush_feedback()
+
+def submit_feedback(feedback_data):
+    with feedback_state_lock:
+        if feedback_state["pid"] != os.getpid():
+            feedback_state["pid"] = os.getpid()
+            threading.Thread(target=feedback_flusher, daemon=True).start()
+    try: feedback_buffer.put_nowait(feedback_data)
+    except queue.Full: return False
+    if feedback_buffer.qsize() >= FEEDBACK_BATCH_SIZE: feedback_wakeup.set()
+    return True
+
+atexit.register(flush_feedback)
+
 @app.route('/contact', methods=['GET', 'POST'])
 def contact():
     if request.method == 'POST':
+        if not allow_feedback(request.remote_addr):
+            return render_template("contact.html", message_sent=False, error_message="Too many messages. Please try again later.", prefill_title=request.form.get("content_title", "")), 429
         feedback_data = {
             "type": request.form.get("type"), "content_title": request.form.get("content_title"),
             "message": request.form.get("message"), "email": request.form.get("email", "").strip(),
             "reported_content_id": request.form.get("reported_content_id"), "timestamp": datetime.utcnow()
         }
-        feedback.insert_one(feedback_data)
-        return render_template_string(contact_html, message_sent=True)
+        if not submit_feedback(feedback_data):
+            return render_template("contact.html", message_sent=False, error_message="We are receiving too many messages right now. Please try again in a minute.", prefill_title=request.form.get("content_title", "")), 503
+        return render_template("contact.html", message_sent=True)
     prefill_title, prefill_id = request.args.get('title', ''), request.args.get('report_id', '')
     prefill_type = 'Problem Report' if prefill_id else 'Movie Request'
-    return render_template_string(contact_html, message_sent=False, prefill_title=prefill_title, prefill_id=prefill_id, prefill_type=prefill_type)
+    return render_template("contact.html", message_sent=False, prefill_title=prefill_title, prefill_id=prefill_id, prefill_type=prefill_type)
+
+# --- কনটেন্ট ফিল্ড নরমালাইজেশন: অ্যাডমিন ফর্ম, এডিট ফর্ম আর বাল্ক ইমপোর্ট একই নিয়মে ডকুমেন্ট বানায় ---
+LINK_QUALITIES = ("480p", "720p", "1080p")
+EPISODE_LINK_QUALITIES = ("480p", "720p")
+
+def as_bool(value):
+    return value is True or str(value or "").strip().lower() in ("true", "1", "yes")
+
+# JSON এ থাকলে আসল তালিকা, CSV বা ফর্মে link_480p এর মতো আলাদা কলাম
+def normalize_links(record, qualities):
+    links = record.get("links")
+    if isinstance(links, str) and links.strip(): links = json.loads(links)
+    if isinstance(links, list): return [{"quality": link["quality"], "url": link["url"]} for link in links if link.get("url")]
+    return [{"quality": quality, "url": record[f"link_{quality}"]} for quality in qualities if record.get(f"link_{quality}")]
+
+def normalize_movie(record):
+    content_type = record.get("type") or "movie"
+    if content_type not in ("movie", "series"): raise ValueError(f"unknown type {content_type!r}")
+    genres = record.get("genres") or []
+    if isinstance(genres, str): genres = genres.split(',')
+    movie_data = {
+        "title": str(record.get("title") or "").strip(), "type": content_type,
+        "is_trending": as_bool(record.get("is_trending")), "is_coming_soon": as_bool(record.get("is_coming_soon")),
+        "poster": (record.get("poster") or "").strip(), "overview": (record.get("overview") or "").strip(),
+        "release_date": (record.get("release_date") or "").strip(), "poster_badge": (record.get("poster_badge") or "").strip(),
+        "genres": [g.strip() for g in genres if g and g.strip()]
+    }
+    if not movie_data["title"]: raise ValueError("title is required")
+    if content_type == "movie":
+        movie_data["watch_link"] = record.get("watch_link") or ""
+        movie_data["links"] = normalize_links(record, LINK_QUALITIES)
+    else: # series
+        episodes = record.get("episodes") or []
+        if isinstance(episodes, str): episodes = json.loads(episodes)
+        movie_data["episodes"] = [{
+            "episode_number": int(episode["episode_number"]), "title": episode.get("title") or "",
+            "watch_link": episode.get("watch_link") or "", "links": normalize_links(episode, EPISODE_LINK_QUALITIES)
+        } for episode in episodes]
+    return movie_data
+
+# টাইপ বদলালে অন্য টাইপের ফিল্ড মুছে ফেলতে হয়
+def stale_type_fields(movie_data):
+    return {"episodes": ""} if movie_data["type"] == "movie" else {"links": "", "watch_link": ""}
+
+def movie_data_from_form(form):
+    record = {key: form.get(key, "") for key in ("title", "overview", "release_date", "poster_badge", "genres", "watch_link", "is_trending", "is_coming_soon")}
+    record.update({f"link_{quality}": form.get(f"link_{quality}") for quality in LINK_QUALITIES})
+    record["type"], record["poster"] = form.get("content_type", "movie"), form.get("poster_url", "")
+    columns = {field: form.getlist(f"episode_{field}[]") for field in ("number", "title", "watch_link", "link_480p", "link_720p")}
+    record["episodes"] = [{"episode_number": number, "title": columns["title"][i], "watch_link": columns["watch_link"][i],
+                           "link_480p": columns["link_480p"][i], "link_720p": columns["link_720p"][i]} for i, number in enumerate(columns["number"])]
+    return normalize_movie(record)
 
 @app.route('/admin', methods=["GET", "POST"])
 @requires_auth
 def admin():
     if request.method == "POST":
         if 'title' in request.form:
-            content_type = request.form.get("content_type", "movie")
-            movie_data = {
-                "title": request.form.get("title"), "type": content_type,
-                "is_trending": request.form.get("is_trending") == "true", "is_coming_soon": request.form.get("is_coming_soon") == "true",
-                "poster": request.form.get("poster_url", "").strip(), "overview": request.form.get("overview", "").strip(),
-                "release_date": request.form.get("release_date", "").strip(), "poster_badge": request.form.get("poster_badge", "").strip(),
-                "genres": [g.strip() for g in request.form.get("genres", "").split(',') if g.strip()]
-            }
-            if content_type == "movie":
-                movie_data["watch_link"] = request.form.get("watch_link", "")
-                links = []
-                if request.form.get("link_480p"): links.append({"quality": "480p", "url": request.form.get("link_480p")})
-                if request.form.get("link_720p"): links.append({"quality": "720p", "url": request.form.get("link_720p")})
-                if request.form.get("link_1080p"): links.append({"quality": "1080p", "url": request.form.get("link_1080p")})
-                movie_data["links"] = links
-            else: # series
-                episodes = []
-                for i in range(len(request.form.getlist('episode_number[]'))):
-                    ep_links = []
-                    if request.form.getlist('episode_link_480p[]')[i]: ep_links.append({"quality": "480p", "url": request.form.getlist('episode_link_480p[]')[i]})
-                    if request.form.getlist('episode_link_720p[]')[i]: ep_links.append({"quality": "720p", "url": request.form.getlist('episode_link_720p[]')[i]})
-                    episodes.append({
-                        "episode_number": int(request.form.getlist('episode_number[]')[i]), "title": request.form.getlist('episode_title[]')[i],
-                        "watch_link": request.form.getlist('episode_watch_link[]')[i], "links": ep_links
-                    })
-                movie_data["episodes"] = episodes
+            try: movie_data = movie_data_from_form(request.form)
+            except ValueError as e: return f"Invalid content: {e}", 400
             movies.insert_one(movie_data)
+            catalog_changed(new=movie_data)
+            queue_enrichment(movie_data["_id"])
         return redirect(url_for('admin'))
     
-    all_content = process_movie_list(list(movies.find().sort('_id', -1)))
-    feedback_list = process_movie_list(list(feedback.find().sort('timestamp', -1)))
-    return render_template_string(admin_html, all_content=all_content, feedback_list=feedback_list)
+    return render_template("admin.html", all_badges=[badge["name"] for badge in get_facets("badge")])
+
+# --- অ্যাডমিন ড্যাশবোর্ড JSON API: কনটেন্ট ও ফিডব্যাক টেবিল পেজে পেজে আসে, ফিল্টার সার্ভারে হয় ---
+ADMIN_PAGE_SIZE = 50
+ADMIN_SEARCH_LIMIT = 1000
+
+def admin_page_limit():
+    return min(max(request.args.get("limit", ADMIN_PAGE_SIZE, type=int), 1), 200)
+
+@app.route('/admin/api/content')
+@requires_auth
+def admin_content_api():
+    query, filters = {}, {key: request.args.get(key, "").strip() for key in ("q", "type", "badge")}
+    if filters["q"]: query["_id"] = {"$in": [ObjectId(card["_id"]) for card in title_index.search(filters["q"], ADMIN_SEARCH_LIMIT, match_all=True)]}
+    if filters["type"]: query["type"] = filters["type"]
+    if filters["badge"]: query["poster_badge"] = filters["badge"]
+    after, limit = request.args.get("after", ""), admin_page_limit()
+    if ObjectId.is_valid(after): query.setdefault("_id", {})["$lt"] = ObjectId(after)
+    page = list(movies.find(query, {"title": 1, "type": 1, "poster_badge": 1}).sort('_id', -1).limit(limit + 1))
+    next_url = None
+    if len(page) > limit:
+        next_url = url_for('admin_content_api', **{key: value for key, value in filters.items() if value}, after=str(page[limit - 1]["_id"]), limit=limit)
+    items = [{"_id": str(m["_id"]), "title": m.get("title"), "type": m.get("type"), "poster_badge": m.get("poster_badge"),
+              "edit_url": url_for('edit_movie', movie_id=str(m["_id"]))} for m in page[:limit]]
+    return jsonify(items=items, next=next_url)
+
+# কার্সর: "<timestamp ISO>_<_id>", sort (timestamp, _id) দুটোই উল্টো ক্রমে
+@app.route('/admin/api/feedback')
+@requires_auth
+def admin_feedback_api():
+    query, limit = {}, admin_page_limit()
+    timestamp, _, feedback_id = request.args.get("after", "").rpartition("_")
+    if timestamp and ObjectId.is_valid(feedback_id):
+        try: timestamp = datetime.fromisoformat(timestamp)
+        except ValueError: return jsonify(error="Invalid cursor"), 400
+        query = {"$or": [{"timestamp": {"$lt": timestamp}}, {"timestamp": timestamp, "_id": {"$lt": ObjectId(feedback_id)}}]}
+    page = list(feedback.find(query).sort([('timestamp', -1), ('_id', -1)]).limit(limit + 1))
+    next_url = None
+    if len(page) > limit:
+        last = page[limit - 1]
+        next_url = url_for('admin_feedback_api', after=f"{last['timestamp'].isoformat()}_{last['_id']}", limit=limit)
+    items = [{"_id": str(item["_id"]), "date": item["timestamp"].strftime('%Y-%m-%d %H:%M'), "type": item.get("type"),
+              "content_title": item.get("content_title"), "message": item.get("message"), "email": item.get("email"),
+              "delete_url": url_for('delete_feedback', feedback_id=str(item["_id"]))} for item in page[:limit]]
+    return jsonify(items=items, next=next_url)
+
+@app.route('/admin/api/status')
+@requires_auth
+def admin_status():
+    return jsonify(tmdb=tmdb_breaker.status(), enrichment_queue=enrich_queue.qsize())
 
 @app.route('/admin/save_ads', methods=['POST'])
 @requires_auth
 def save_ads():
     ad_codes = { "popunder_code": request.form.get("popunder_code", ""), "social_bar_code": request.form.get("social_bar_code", ""), "banner_ad_code": request.form.get("banner_ad_code", ""), "native_banner_code": request.form.get("native_banner_code", "") }
-    settings.update_one({}, {"$set": ad_codes}, upsert=True)
+    settings.update_one({}, {"$set": {**ad_codes, "updated_at": datetime.utcnow().replace(microsecond=0)}, "$inc": {"version": 1}}, upsert=True)
+    get_ad_settings(refresh=True)
+    clear_page_cache() # বিজ্ঞাপন সব পেজেই থাকে
+    purge_pages({"all"})
     return redirect(url_for('admin'))
 
 @app.route('/edit_movie/<movie_id>', methods=["GET", "POST"])
@@ -1014,44 +2283,22 @@ def edit_movie(movie_id):
     movie_obj = movies.find_one({"_id": ObjectId(movie_id)})
     if not movie_obj: return "Movie not found", 404
     if request.method == "POST":
-        content_type = request.form.get("content_type", "movie")
-        update_data = {
-            "title": request.form.get("title"), "type": content_type,
-            "is_trending": request.form.get("is_trending") == "true", "is_coming_soon": request.form.get("is_coming_soon") == "true",
-            "poster": request.form.get("poster_url", "").strip(), "overview": request.form.get("overview", "").strip(),
-            "release_date": request.form.get("release_date", "").strip(), "poster_badge": request.form.get("poster_badge", "").strip(),
-            "genres": [g.strip() for g in request.form.get("genres", "").split(',') if g.strip()]
-        }
-        if content_type == "movie":
-            update_data["watch_link"] = request.form.get("watch_link", "")
-            links = []
-            if request.form.get("link_480p"): links.append({"quality": "480p", "url": request.form.get("link_480p")})
-            if request.form.get("link_720p"): links.append({"quality": "720p", "url": request.form.get("link_720p")})
-            if request.form.get("link_1080p"): links.append({"quality": "1080p", "url": request.form.get("link_1080p")})
-            update_data["links"] = links
-            movies.update_one({"_id": ObjectId(movie_id)}, {"$unset": {"episodes": ""}})
-        else: # series
-            episodes = []
-            for i in range(len(request.form.getlist('episode_number[]'))):
-                ep_links = []
-                if request.form.getlist('episode_link_480p[]')[i]: ep_links.append({"quality": "480p", "url": request.form.getlist('episode_link_480p[]')[i]})
-                if request.form.getlist('episode_link_720p[]')[i]: ep_links.append({"quality": "720p", "url": request.form.getlist('episode_link_720p[]')[i]})
-                episodes.append({
-                    "episode_number": int(request.form.getlist('episode_number[]')[i]), "title": request.form.getlist('episode_title[]')[i],
-                    "watch_link": request.form.getlist('episode_watch_link[]')[i], "links": ep_links
-                })
-            update_data["episodes"] = episodes
-            movies.update_one({"_id": ObjectId(movie_id)}, {"$unset": {"links": "", "watch_link": ""}})
-        movies.update_one({"_id": ObjectId(movie_id)}, {"$set": update_data})
+        try: update_data = movie_data_from_form(request.form)
+        except ValueError as e: return f"Invalid content: {e}", 400
+        # ফাঁকা রাখা ফিল্ড আবার TMDb থেকে আনার জন্য এনরিচমেন্ট নতুন করে হবে
+        unset = {**stale_type_fields(update_data), "tmdb_checked_at": ""}
+        movies.update_one({"_id": ObjectId(movie_id)}, {"$set": update_data, "$unset": unset})
+        catalog_changed(movie_obj, {**{key: value for key, value in movie_obj.items() if key not in unset}, **update_data})
+        queue_enrichment(movie_obj["_id"])
         return redirect(url_for('admin'))
     
     movie_obj['_id'] = str(movie_obj['_id'])
-    return render_template_string(edit_html, movie=movie_obj)
+    return render_template("edit.html", movie=movie_obj)
 
 @app.route('/delete_movie/<movie_id>')
 @requires_auth
 def delete_movie(movie_id):
-    movies.delete_one({"_id": ObjectId(movie_id)})
+    catalog_changed(old=movies.find_one_and_delete({"_id": ObjectId(movie_id)}))
     return redirect(url_for('admin'))
 
 @app.route('/feedback/delete/<feedback_id>')
@@ -1060,43 +2307,431 @@ def delete_feedback(feedback_id):
     feedback.delete_one({"_id": ObjectId(feedback_id)})
     return redirect(url_for('admin'))
 
-def render_full_list(content_list, title):
-    return render_template_string(index_html, movies=process_movie_list(content_list), query=title, is_full_page_list=True)
+# --- ফুল লিস্ট পেজ: _id এর উপর কার্সর পেজিনেশন (?after=<id>&limit=), পরের পেজ JSON ফ্র্যাগমেন্ট হিসেবে আসে ---
+LIST_PAGE_SIZE = 24
+LIST_PAGE_MAX = 100
+FULL_LISTS = { # list_name -> (title, query builder)
+    "trending": ("Trending Now", lambda value: {"is_trending": True, "is_coming_soon": {"$ne": True}}),
+    "movies": ("All Movies", lambda value: {"type": "movie", "is_coming_soon": {"$ne": True}}),
+    "series": ("All Web Series", lambda value: {"type": "series", "is_coming_soon": {"$ne": True}}),
+    "coming_soon": ("Coming Soon", lambda value: {"is_coming_soon": True}),
+    "recent": ("Recently Added", lambda value: {"is_coming_soon": {"$ne": True}}),
+    "genre": ("Genre: {}", lambda value: {"genres": value}),
+    "badge": ("Tag: {}", lambda value: {"poster_badge": value})
+}
+
+def fetch_list_page(list_name, value=None, projection=CARD_PROJECTION):
+    query = FULL_LISTS[list_name][1](value)
+    limit = min(max(request.args.get("limit", LIST_PAGE_SIZE, type=int), 1), LIST_PAGE_MAX)
+    after = request.args.get("after", "")
+    if ObjectId.is_valid(after): query["_id"] = {"$lt": ObjectId(after)}
+    page = list(movies.find(query, projection).sort('_id', -1).limit(limit + 1))
+    next_after = str(page[limit - 1]["_id"]) if len(page) > limit else None
+    cache_tag(f"list:{list_name}" if value is None else f"{list_name}:{value}")
+    return process_movie_list(page[:limit]), next_after, limit
+
+def render_full_list(list_name, value=None):
+    content_list, next_after, limit = fetch_list_page(list_name, value)
+    next_page_url = next_fragment_url = None
+    if next_after:
+        next_page_url = url_for(request.endpoint, **request.view_args, after=next_after, limit=limit)
+        next_fragment_url = url_for('list_fragment', list_name=list_name, value=value, after=next_after, limit=limit)
+    return render_template("index.html", movies=content_list, query=FULL_LISTS[list_name][0].format(value), is_full_page_list=True,
+                           next_page_url=next_page_url, next_fragment_url=next_fragment_url)
+
+@app.route('/api/list/<list_name>')
+@cached_page
+def list_fragment(list_name):
+    if list_name not in FULL_LISTS: return jsonify(error="Unknown list"), 404
+    value = request.args.get("value")
+    content_list, next_after, limit = fetch_list_page(list_name, value)
+    next_url = url_for('list_fragment', list_name=list_name, value=value, after=next_after, limit=limit) if next_after else None
+    return jsonify(html=render_template("cards.html", movies=content_list), next=next_url)
 
 @app.route('/badge/<badge_name>')
+@cached_page
 def movies_by_badge(badge_name):
-    return render_full_list(list(movies.find({"poster_badge": badge_name}).sort('_id', -1)), f'Tag: {badge_name}')
+    return render_full_list("badge", badge_name)
 
 @app.route('/genres')
+@cached_page
 def genres_page():
-    all_genres = movies.distinct("genres")
-    all_genres = sorted([g for g in all_genres if g])
-    return render_template_string(genres_html, genres=all_genres, title="Browse by Genre")
+    cache_tag("genres")
+    return render_template("genres.html", genres=get_facets("genre"), title="Browse by Genre")
 
 @app.route('/genre/<genre_name>')
+@cached_page
 def movies_by_genre(genre_name):
-    return render_full_list(list(movies.find({"genres": genre_name}).sort('_id', -1)), f'Genre: {genre_name}')
+    return render_full_list("genre", genre_name)
 
 @app.route('/trending_movies')
+@cached_page
 def trending_movies():
-    return render_full_list(list(movies.find({"is_trending": True, "is_coming_soon": {"$ne": True}}).sort('_id', -1)), "Trending Now")
+    return render_full_list("trending")
 
 @app.route('/movies_only')
+@cached_page
 def movies_only():
-    return render_full_list(list(movies.find({"type": "movie", "is_coming_soon": {"$ne": True}}).sort('_id', -1)), "All Movies")
+    return render_full_list("movies")
 
 @app.route('/webseries')
+@cached_page
 def webseries():
-    return render_full_list(list(movies.find({"type": "series", "is_coming_soon": {"$ne": True}}).sort('_id', -1)), "All Web Series")
+    return render_full_list("series")
 
 @app.route('/coming_soon')
+@cached_page
 def coming_soon():
-    return render_full_list(list(movies.find({"is_coming_soon": True}).sort('_id', -1)), "Coming Soon")
+    return render_full_list("coming_soon")
 
 @app.route('/recently_added')
+@cached_page
 def recently_added_all():
-    return render_full_list(list(movies.find({"is_coming_soon": {"$ne": True}}).sort('_id', -1)), "Recently Added")
+    return render_full_list("recent")
+# --- পাবলিক JSON API (/api/v1): HTML রুটের মতোই কুয়েরি, পেজ ক্যাশ, ETag ও Surrogate-Key ---
+# ?fields=title,poster দিয়ে শুধু দরকারি ফিল্ড; লিস্টে ?after=<id>&limit= কার্সর, উত্তরে {"items", "next"}
+API_FIELDS = ("title", "type", "poster", "poster_badge", "overview", "release_date", "genres", "is_trending", "is_coming_soon",
+              "vote_average", "tmdb_id", "trailer_key", "watch_link", "links", "episodes")
+API_LIST_FIELDS = ("title", "type", "poster", "poster_badge")
+API_DETAIL_FIELDS = tuple(field for field in API_FIELDS if field != "episodes") # episodes আলাদা এন্ডপয়েন্টে
+API_LISTS = ("trending", "movies", "series", "coming_soon", "recent")
+
+def api_json(payload, status=200):
+    if orjson: body = orjson.dumps(payload, default=export_value)
+    else: body = json.dumps(payload, default=export_value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return Response(body, status=status, mimetype="application/json")
+
+def api_projection(default):
+    fields = [field.strip() for field in request.args.get("fields", "").split(",") if field.strip()] or default
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if unknown: return None, api_json({"error": f"Unknown fields: {', '.join(unknown)}", "fields": API_FIELDS}, 400)
+    return {field: 1 for field in fields}, None
+
+def api_list(list_name, value=None):
+    projection, error = api_projection(API_LIST_FIELDS)
+    if error: return error
+    items, next_after, limit = fetch_list_page(list_name, value, projection)
+    next_url = None
+    if next_after: next_url = url_for(request.endpoint, **request.view_args, fields=request.args.get("fields"), after=next_after, limit=limit)
+    return api_json({"items": items, "next": next_url})
+
+def api_title(movie_id, projection):
+    if not ObjectId.is_valid(movie_id): return None
+    cache_tag(f"movie:{movie_id}")
+    return movies.find_one({"_id": ObjectId(movie_id)}, projection)
+
+@app.route('/api/v1/lists/<list_name>')
+@cached_page
+def api_list_titles(list_name):
+    if list_name not in API_LISTS: return api_json({"error": "Unknown list", "lists": API_LISTS}, 404)
+    return api_list(list_name)
+
+@app.route('/api/v1/genres/<genre_name>')
+@cached_page
+def api_genre_titles(genre_name):
+    return api_list("genre", genre_name)
+
+@app.route('/api/v1/badges/<badge_name>')
+@cached_page
+def api_badge_titles(badge_name):
+    return api_list("badge", badge_name)
+
+@app.route('/api/v1/titles/<movie_id>')
+@cached_page
+def api_title_detail(movie_id):
+    projection, error = api_projection(API_DETAIL_FIELDS)
+    if error: return error
+    movie = api_title(movie_id, projection)
+    if not movie: return api_json({"error": "Title not found"}, 404)
+    return api_json({"item": movie})
+
+# এপিসোড ডকুমেন্টের ভেতরেই থাকে; কার্সর হলো শেষ episode_number
+@app.route('/api/v1/titles/<movie_id>/episodes')
+@cached_page
+def api_title_episodes(movie_id):
+    movie = api_title(movie_id, {"type": 1, "episodes": 1})
+    if not movie: return api_json({"error": "Title not found"}, 404)
+    if movie.get("type") != "series": return api_json({"error": "Not a series"}, 404)
+    limit = min(max(request.args.get("limit", LIST_PAGE_SIZE, type=int), 1), LIST_PAGE_MAX)
+    after = request.args.get("after", type=int)
+    episodes = sorted(movie.get("episodes") or [], key=lambda episode: episode.get("episode_number") or 0)
+    if after is not None: episodes = [episode for episode in episodes if (episode.get("episode_number") or 0) > after]
+    next_url = None
+    if len(episodes) > limit: next_url = url_for('api_title_episodes', movie_id=movie_id, after=episodes[limit - 1].get("episode_number") or 0, limit=limit)
+    return api_json({"items": episodes[:limit], "next": next_url})
+
+# --- বাল্ক ইমপোর্ট/এক্সপোর্ট: NDJSON বা CSV, লাইন ধরে ধরে পড়া/লেখা হয়, পুরো কালেকশন কখনো মেমোরিতে আসে না ---
+# ইমপোর্ট: _id থাকলে সেটি, নাহলে (title, type) দিয়ে upsert; python bot.py import FILE অথবা POST /admin/import
+IMPORT_BATCH_SIZE = 500
+EXPORT_CSV_FIELDS = ["_id", "title", "type", "is_trending", "is_coming_soon", "poster", "overview", "release_date", "poster_badge", "genres", "watch_link", "links", "episodes"]
+
+def catalog_format(name, fallback="ndjson"):
+    name = (name or "").lower()
+    return "csv" if name.endswith("csv") else "ndjson" if name.endswith(("json", "jsonl")) else fallback
+
+def import_records(lines, fmt):
+    if fmt == "csv":
+        for row_number, row in enumerate(csv.DictReader(lines), 2): yield row_number, row
+        return
+    for row_number, line in enumerate(lines, 1):
+        if line.strip(): yield row_number, line
+
+# রেকর্ডে যে কলাম/কী আছে শুধু সেগুলোই বিদ্যমান টাইটেলে লেখা হয়; বাকি ডিফল্ট কেবল নতুন ডকুমেন্টে ($setOnInsert)
+IMPORT_FIELD_SOURCES = {"links": ("links", *(f"link_{quality}" for quality in LINK_QUALITIES))}
+
+def import_operation(record):
+    if isinstance(record, str): record = json.loads(record)
+    movie_data = normalize_movie(record)
+    movie_id = str(record.get("_id") or "")
+    key = {"_id": ObjectId(movie_id)} if ObjectId.is_valid(movie_id) else {"title": movie_data["title"], "type": movie_data["type"]}
+    present = {field for field in movie_data if any(source in record for source in IMPORT_FIELD_SOURCES.get(field, (field,)))}
+    update = {"$set": {field: movie_data[field] for field in present}}
+    defaults = {field: value for field, value in movie_data.items() if field not in present}
+    if defaults: update["$setOnInsert"] = defaults
+    if "type" in record: update["$unset"] = stale_type_fields(movie_data)
+    return UpdateOne(key, update, upsert=True)
+
+def import_catalog(lines, fmt, batch_size=IMPORT_BATCH_SIZE, reload=None):
+    summary = {"processed": 0, "inserted": 0, "updated": 0, "failed": 0, "errors": []}
+    def fail(row_number, error):
+        summary["failed"] += 1
+        if len(summary["errors"]) < 20: summary["errors"].append(f"row {row_number}: {error}")
+    def flush(operations, rows):
+        try: result = movies.bulk_write(operations, ordered=False).bulk_api_result
+        except BulkWriteError as e:
+            result = e.details
+            for error in result.get("writeErrors", []): fail(rows[error["index"]], error.get("errmsg"))
+        summary["inserted"] += result.get("nUpserted", 0)
+        summary["updated"] += result.get("nModified", 0)
+    operations, rows = [], []
+    for row_number, record in import_records(lines, fmt):
+        summary["processed"] += 1
+        try: operations.append(import_operation(record))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            fail(row_number, e)
+            continue
+        rows.append(row_number)
+        if len(operations) >= batch_size:
+            flush(operations, rows)
+            operations, rows = [], []
+    if operations: flush(operations, rows)
+    if summary["inserted"] or summary["updated"]: (reload or catalog_reloaded)()
+    return summary
+
+# অনেক ডকুমেন্ট একসাথে বদলালে প্রতিটির জন্য catalog_changed না চালিয়ে সব ডেরাইভড ডেটা একবারে নতুন করে
+def catalog_reloaded():
+    rebuild_facets()
+    build_related()
+    bump_catalog_version()
+    reset_local_caches()
+    purge_pages({"all"})
+
+reload_state = {"running": False, "pending": False}
+reload_lock = threading.Lock()
+
+def catalog_reload_worker():
+    while True:
+        with reload_lock:
+            if not reload_state["pending"]:
+                reload_state["running"] = False
+                return
+            reload_state["pending"] = False
+        try: catalog_reloaded()
+        except PyMongoError as e: print(f"Catalog reload failed: {e}")
+
+# ওয়েব রিকোয়েস্ট থেকে: ক্যাশ এখনই বাতিল, পুরো related/facets হিসাব ব্যাকগ্রাউন্ডে (একটা চলমান রান, বাকিরা মিলে একটা অপেক্ষমাণ রান)
+def schedule_catalog_reload():
+    bump_catalog_version()
+    reset_local_caches()
+    with reload_lock:
+        reload_state["pending"] = True
+        if reload_state["running"]: return
+        reload_state["running"] = True
+    threading.Thread(target=catalog_reload_worker, daemon=True).start()
+
+def export_value(value):
+    if isinstance(value, ObjectId): return str(value)
+    if isinstance(value, datetime): return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def export_catalog(fmt, batch_size=IMPORT_BATCH_SIZE):
+    cursor = movies.find({}, {"related": 0}).sort("_id", 1).batch_size(batch_size)
+    if fmt != "csv":
+        for movie in cursor: yield json.dumps(movie, default=export_value, ensure_ascii=False) + "\n"
+        return
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, EXPORT_CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for movie in cursor:
+        row = {**movie, "_id": str(movie["_id"]), "genres": ", ".join(movie.get("genres") or [])}
+        for key in ("is_trending", "is_coming_soon"): row[key] = "true" if movie.get(key) else "false"
+        for key in ("links", "episodes"):
+            if key in movie: row[key] = json.dumps(movie[key], ensure_ascii=False)
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+@app.route('/admin/import', methods=['POST'])
+@requires_auth
+def admin_import():
+    upload = request.files.get("file")
+    fmt = request.args.get("format") or request.form.get("format") or catalog_format(upload.filename if upload else request.mimetype)
+    stream = upload.stream if upload else request.stream
+    return jsonify(import_catalog(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""), catalog_format(fmt), reload=schedule_catalog_reload))
+
+@app.route('/admin/export')
+@requires_auth
+def admin_export():
+    fmt = catalog_format(request.args.get("format"))
+    filename = f"moviezone-catalog-{datetime.utcnow():%Y%m%d}.{'csv' if fmt == 'csv' else 'ndjson'}"
+    return Response(stream_with_context(export_catalog(fmt)), mimetype="text/csv" if fmt == "csv" else "application/x-ndjson",
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+# --- TMDb ব্যাকফিল CLI: python bot.py backfill [--workers N] [--batch-size N] [--checkpoint FILE] ---
+# _id এর ক্রমে চলে, প্রতিটি ব্যাচ bulk_write এর পরে শেষ _id চেকপয়েন্ট ফাইলে লেখা হয়; বাধা পেলে সেখান থেকে আবার শুরু হয়
+BACKFILL_QUERY = {"$or": [{"tmdb_id": None}, {"poster": {"$in": [None, ""]}}, {"overview": {"$in": [None, ""]}}, {"genres": {"$in": [None, []]}}]}
+BACKFILL_PROJECTION = {"title": 1, "type": 1, "tmdb_id": 1, "poster": 1, "overview": 1, "release_date": 1, "genres": 1, "vote_average": 1, "trailer_key": 1, "poster_badge": 1, "is_trending": 1, "is_coming_soon": 1}
+
+def backfill_fetch(movie_obj):
+    try: return movie_obj, fetch_tmdb_fields(movie_obj), None
+    except requests.RequestException as e: return movie_obj, None, e
+
+def wait_for_tmdb():
+    # খোলা ব্রেকার নিজে half_open হয় না (allow() করে); retry_in শেষ হলে পরের কলটাই প্রোব হিসেবে যায়
+    while True:
+        state = tmdb_breaker.status()
+        if state["state"] != "open" or state["retry_in"] <= 0: return
+        time.sleep(state["retry_in"] + 0.1)
+
+def backfill_tmdb(workers, batch_size, checkpoint_path):
+    if not TMDB_API_KEY: sys.exit("TMDB_API_KEY is not set.")
+    query = dict(BACKFILL_QUERY)
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f: query["_id"] = {"$gt": ObjectId(f.read().strip())}
+        print(f"Resuming after {query['_id']['$gt']}")
+    total = movies.count_documents(query)
+    done = updated = 0
+    retry = [] # ব্যর্থ টাইটেল; শেষে আরেকবার চেষ্টা হয়, চেকপয়েন্ট প্রথম ব্যর্থটির আগে থেমে থাকে
+    started = time.monotonic()
+    cursor = movies.find(query, BACKFILL_PROJECTION).sort("_id", 1).batch_size(batch_size)
+
+    def save_checkpoint(last_id):
+        with open(checkpoint_path + ".tmp", "w") as f: f.write(str(last_id))
+        os.replace(checkpoint_path + ".tmp", checkpoint_path)
+
+    def process(pool, batch):
+        wait_for_tmdb()
+        operations, failures, changed = [], [], 0
+        for movie_obj, update_fields, error in pool.map(backfill_fetch, batch):
+            if error is not None:
+                failures.append(movie_obj)
+                print(f"TMDb API error for '{movie_obj.get('title')}': {error}")
+                continue
+            checked = {"tmdb_checked_at": datetime.utcnow()}
+            operations.append(UpdateOne({"_id": movie_obj["_id"]}, {"$set": {**update_fields, **checked}}))
+            changed += len(update_fields) > 1
+        if operations: movies.bulk_write(operations, ordered=False)
+        return failures, changed
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                batch = [movie_obj for _, movie_obj in zip(range(batch_size), cursor)]
+                if not batch: break
+                failures, changed = process(pool, batch)
+                if not retry:
+                    ok = batch.index(failures[0]) if failures else len(batch)
+                    if ok: save_checkpoint(batch[ok - 1]["_id"])
+                retry += failures
+                done, updated = done + len(batch), updated + changed
+                elapsed = time.monotonic() - started
+                print(f"{done}/{total} processed, {updated} updated, {len(retry)} failed, {done / elapsed:.1f} titles/s")
+            if retry:
+                print(f"Retrying {len(retry)} failed titles")
+                pending, retry = retry, []
+                for i in range(0, len(pending), batch_size):
+                    failures, changed = process(pool, pending[i:i + batch_size])
+                    retry, updated = retry + failures, updated + changed
+    except KeyboardInterrupt:
+        print(f"Interrupted. Run the same command again to resume from {checkpoint_path}.")
+        return
+    finally:
+        # টাইটেল প্রতি catalog_changed এর বদলে পুরো রানে একবার: related/facets একবারে বানানো, একটাই ভার্শন বাম্প ও পার্জ
+        if updated: catalog_reloaded()
+    if retry:
+        print(f"{len(retry)} titles still failing; run the same command again to retry them.")
+    elif os.path.exists(checkpoint_path): os.remove(checkpoint_path)
+    print(f"Backfill finished: {done} processed, {updated} updated, {len(retry)} failed in {time.monotonic() - started:.1f}s")
+
+# --- ইনডেক্স সেলফ-চেক: প্রতিটি রুটের কুয়েরির explain() দেখে ---
+def index_check_queries():
+    checks = [(f"list:{name}", movies, query("sample"), [("_id", -1)]) for name, (title, query) in FULL_LISTS.items()]
+    checks += [
+        ("movie_detail related", movies, {"genres": {"$in": ["sample"]}, "_id": {"$ne": ObjectId()}}, None),
+        ("admin feedback", feedback, {}, [("timestamp", -1), ("_id", -1)]),
+        ("genres_page facets", facets, {"kind": "genre", "count": {"$gt": 0}}, [("name", 1)])
+    ]
+    return checks
+
+def plan_stages(plan):
+    if isinstance(plan, dict):
+        stages = [plan["stage"]] if "stage" in plan else []
+        for value in plan.values(): stages += plan_stages(value)
+        return stages
+    if isinstance(plan, list): return [stage for item in plan for stage in plan_stages(item)]
+    return []
+
+def check_indexes():
+    ensure_indexes()
+    problems = 0
+    for name, collection, query, sort in index_check_queries():
+        cursor = collection.find(query).limit(LIST_PAGE_SIZE)
+        if sort: cursor = cursor.sort(sort)
+        stages = plan_stages(cursor.explain().get("queryPlanner", {}).get("winningPlan", {}))
+        bad = [stage for stage in stages if stage in ("COLLSCAN", "SORT")]
+        problems += bool(bad)
+        print(f"{'PROBLEM' if bad else 'OK':8} {name:24} {' > '.join(stages)}")
+    print(f"{problems} queries need attention." if problems else "All route queries use indexes.")
+    return problems
 
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 5000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+    parser = argparse.ArgumentParser(description="MovieZone web app and maintenance commands")
+    commands = parser.add_subparsers(dest="command")
+    backfill_parser = commands.add_parser("backfill", help="Fetch missing TMDb data for the whole catalog")
+    backfill_parser.add_argument("--workers", type=int, default=8)
+    backfill_parser.add_argument("--batch-size", type=int, default=100)
+    backfill_parser.add_argument("--checkpoint", default="backfill.checkpoint")
+    commands.add_parser("check-indexes", help="Create indexes and explain() every route query")
+    commands.add_parser("rebuild-facets", help="Recount genre and badge facets from the movies collection")
+    commands.add_parser("build-related", help="Precompute related titles for every document")
+    import_parser = commands.add_parser("import", help="Upsert titles from an NDJSON or CSV file ('-' for stdin)")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--format", choices=["ndjson", "csv"])
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    export_parser = commands.add_parser("export", help="Write the catalog as NDJSON or CSV ('-' for stdout)")
+    export_parser.add_argument("file")
+    export_parser.add_argument("--format", choices=["ndjson", "csv"])
+    args = parser.parse_args()
+    if args.command == "backfill":
+        backfill_tmdb(args.workers, args.batch_size, args.checkpoint)
+    elif args.command == "check-indexes":
+        sys.exit(1 if check_indexes() else 0)
+    elif args.command == "rebuild-facets":
+        print(f"Rebuilt {rebuild_facets()} facets.")
+    elif args.command == "build-related":
+        print(f"Computed related titles for {build_related()} documents.")
+    elif args.command == "import":
+        fmt = args.format or catalog_format(args.file)
+        with (open(args.file, encoding="utf-8-sig", newline="") if args.file != "-" else sys.stdin) as f:
+            summary = import_catalog(f, fmt, args.batch_size)
+        for error in summary.pop("errors"): print(error)
+        print(", ".join(f"{value} {key}" for key, value in summary.items()))
+        if summary["inserted"] and TMDB_API_KEY: print("Run 'python bot.py backfill' to fetch TMDb details for the new titles.")
+    elif args.command == "export":
+        fmt = args.format or catalog_format(args.file)
+        with (open(args.file, "w", encoding="utf-8", newline="") if args.file != "-" else sys.stdout) as f:
+            for chunk in export_catalog(fmt): f.write(chunk)
+    else:
+        port = int(os.environ.get("PORT", 5000))
+        app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,108 @@
+# টেস্ট চালাতে: pip install pytest mongomock, তারপর python -m pytest -q
+# bot.py ইমপোর্টের সময়েই ডাটাবেসে কানেক্ট করে, তাই আসল MongoDB এর বদলে mongomock এর ইন-মেমরি ক্লায়েন্ট বসানো হয়
+import json, os, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def mongomock_bulk_write(self, requests, ordered=True, **kwargs):
+    # mongomock এর bulk_write নতুন pymongo এর UpdateOne(sort=...) বোঝে না, তাই অপারেশনগুলো একটা একটা করে চালানো হয়
+    import pymongo
+    result = {"nInserted": 0, "nUpserted": 0, "nModified": 0, "nRemoved": 0, "writeErrors": []}
+    for op in requests:
+        if isinstance(op, pymongo.UpdateOne):
+            r = self.update_one(op._filter, op._doc, upsert=op._upsert)
+            result["nUpserted"] += r.upserted_id is not None
+            result["nModified"] += r.modified_count
+        elif isinstance(op, pymongo.InsertOne):
+            self.insert_one(op._doc)
+            result["nInserted"] += 1
+        elif isinstance(op, pymongo.DeleteOne):
+            result["nRemoved"] += self.delete_one(op._filter).deleted_count
+    return type("BulkWriteResult", (), {"bulk_api_result": result})()
+
+
+@pytest.fixture(scope="session")
+def bot():
+    mongomock = pytest.importorskip("mongomock")
+    import pymongo
+    os.environ.setdefault("MONGO_URI", "mongodb://localhost/test")
+    pymongo.MongoClient = mongomock.MongoClient
+    mongomock.collection.Collection.bulk_write = mongomock_bulk_write
+    import bot as bot_module
+    return bot_module
+
+
+class StubTmdb(BaseHTTPRequestHandler):
+    # প্রতিটি টেস্ট নিজের মতো করে বদলায়: delay (সেকেন্ড), status, retry_after (একবারের 429), body
+    state = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        state = StubTmdb.state
+        state["hits"].append(self.path)
+        time.sleep(state["delay"])
+        if state["retry_after"] is not None:
+            self.send_response(429)
+            self.send_header("Retry-After", str(state["retry_after"]))
+            state["retry_after"] = None
+            self.end_headers()
+            return
+        body = json.dumps(state["body"]).encode()
+        self.send_response(state["status"])
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="session")
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTmdb)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/3"
+    server.shutdown()
+
+
+@pytest.fixture
+def tmdb_stub(bot, stub_server, monkeypatch):
+    StubTmdb.state = {"hits": [], "delay": 0, "status": 200, "retry_after": None, "body": {"id": 42, "videos": {"results": []}}}
+    monkeypatch.setattr(bot, "TMDB_BASE_URL", stub_server)
+    monkeypatch.setattr(bot, "TMDB_API_KEY", "test-key")
+    monkeypatch.setattr(bot, "tmdb_breaker", bot.CircuitBreaker(failure_threshold=3, slow_call_seconds=0.5, reset_timeout=0.3))
+    monkeypatch.setattr(bot, "tmdb_rate_limiter", bot.TokenBucket(1000, 1000))
+    bot.tmdb_memory_cache.clear()
+    bot.tmdb_cache.delete_many({})
+    return StubTmdb.state
+
+
+class StubPurge(BaseHTTPRequestHandler):
+    # statuses: পরপর উত্তরগুলোর স্ট্যাটাস, শেষটা বারবার; requests: পাওয়া (path, headers)
+    state = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        state = StubPurge.state
+        state["requests"].append((self.path, dict(self.headers)))
+        statuses = state["statuses"]
+        self.send_response(statuses.pop(0) if len(statuses) > 1 else statuses[0])
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+@pytest.fixture
+def purge_stub(bot, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubPurge)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    StubPurge.state = {"requests": [], "statuses": [200]}
+    monkeypatch.setattr(bot, "PURGE_URL", f"http://127.0.0.1:{server.server_port}/purge")
+    monkeypatch.setattr(bot, "PURGE_TOKEN", "secret")
+    monkeypatch.setattr(bot, "PURGE_RETRY_DELAY", 0.05)
+    yield StubPurge.state
+    server.shutdown()
@@ -0,0 +1,40 @@
+import base64
+import threading
+import pytest
+from bson import ObjectId
+
+
+@pytest.fixture
+def admin(bot):
+    client = bot.app.test_client()
+    token = base64.b64encode(f"{bot.ADMIN_USERNAME}:{bot.ADMIN_PASSWORD}".encode()).decode()
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Basic {token}"
+    return client
+
+
+def test_deleting_a_missing_title_changes_nothing(bot, admin):
+    movie_id = bot.movies.insert_one({"title": "gone", "type": "movie"}).inserted_id
+    assert admin.get(f"/delete_movie/{movie_id}").status_code == 302
+    version = bot.get_catalog_version()
+    assert admin.get(f"/delete_movie/{movie_id}").status_code == 302
+    assert admin.get(f"/delete_movie/{ObjectId()}").status_code == 302
+    assert bot.get_catalog_version() == version
+
+
+def test_web_import_rebuilds_related_titles_in_the_background(bot, admin, monkeypatch):
+    release, rebuilt = threading.Event(), threading.Event()
+
+    def slow_build_related():
+        release.wait(5)
+        rebuilt.set()
+
+    monkeypatch.setattr(bot, "build_related", slow_build_related)
+    version = bot.get_catalog_version()
+    body = '{"title": "Imported", "type": "movie", "genres": ["Drama"]}\n'
+    response = admin.post("/admin/import?format=jsonl", data=body, content_type="application/x-ndjson")
+    assert response.get_json()["inserted"] == 1
+    assert not rebuilt.is_set()
+    assert bot.get_catalog_version() > version
+    release.set()
+    assert rebuilt.wait(5)
+    bot.movies.delete_many({"title": "Imported"})
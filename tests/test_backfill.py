@@ -0,0 +1,61 @@
+import time
+import pytest
+import requests
+
+
+@pytest.fixture
+def catalog(bot, tmdb_stub):
+    bot.movies.delete_many({})
+    bot.movies.insert_many([{"title": f"t{i}", "type": "movie", "tmdb_id": 100 + i} for i in range(6)])
+    tmdb_stub["body"] = {"id": 42, "overview": "ov", "videos": {"results": []}}
+    yield bot.movies
+    bot.movies.delete_many({})
+
+
+def test_wait_for_tmdb_returns_once_the_probe_is_due(bot, tmdb_stub):
+    tmdb_stub["status"] = 500
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError): bot.tmdb_get("movie/1")
+    started = time.monotonic()
+    bot.wait_for_tmdb()
+    assert 0.25 < time.monotonic() - started < 2
+    assert bot.tmdb_breaker.allow()
+
+
+def test_failed_titles_hold_the_checkpoint_and_are_retried(bot, catalog, monkeypatch, tmp_path):
+    checkpoint = str(tmp_path / "backfill.checkpoint")
+    fetch, attempts = bot.backfill_fetch, []
+
+    def flaky_fetch(movie_obj):
+        attempts.append(movie_obj["title"])
+        if movie_obj["title"] == "t2" and attempts.count("t2") == 1: return movie_obj, None, requests.ConnectionError("boom")
+        return fetch(movie_obj)
+
+    monkeypatch.setattr(bot, "backfill_fetch", flaky_fetch)
+    bot.backfill_tmdb(workers=1, batch_size=4, checkpoint_path=checkpoint)
+    assert attempts.count("t2") == 2
+    assert catalog.count_documents({"overview": "ov"}) == 6
+    assert not (tmp_path / "backfill.checkpoint").exists()
+
+
+def test_checkpoint_stops_before_the_first_failure(bot, catalog, monkeypatch, tmp_path):
+    checkpoint = str(tmp_path / "backfill.checkpoint")
+    fetch = bot.backfill_fetch
+
+    def failing_fetch(movie_obj):
+        if movie_obj["title"] == "t2": return movie_obj, None, requests.ConnectionError("boom")
+        return fetch(movie_obj)
+
+    monkeypatch.setattr(bot, "backfill_fetch", failing_fetch)
+    bot.backfill_tmdb(workers=2, batch_size=4, checkpoint_path=checkpoint)
+    t1 = catalog.find_one({"title": "t1"})["_id"]
+    assert open(checkpoint).read() == str(t1)
+    assert catalog.count_documents({"overview": "ov"}) == 5
+
+
+def test_backfill_reloads_the_catalog_once(bot, catalog, monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(bot, "catalog_changed", lambda *args: calls.append("changed"))
+    monkeypatch.setattr(bot, "catalog_reloaded", lambda: calls.append("reloaded"))
+    bot.backfill_tmdb(workers=2, batch_size=4, checkpoint_path=str(tmp_path / "backfill.checkpoint"))
+    assert calls == ["reloaded"]
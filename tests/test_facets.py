@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.fixture
+def drama(bot):
+    bot.movies.delete_many({})
+    bot.facets.delete_many({})
+    bot.clear_page_cache()
+    movie = {"title": "No poster", "type": "movie", "genres": ["Drama"], "poster": ""}
+    movie["_id"] = bot.movies.insert_one(dict(movie)).inserted_id
+    bot.catalog_changed(new=movie)
+    yield movie
+    bot.movies.delete_many({})
+    bot.facets.delete_many({})
+
+
+def test_filling_an_empty_facet_poster_touches_the_facet(bot, drama):
+    new = {**drama, "poster": "https://img/drama.jpg"}
+    assert bot.update_facets(drama, new) == {("genre", "Drama")}
+    assert bot.facets.find_one({"_id": "genre:Drama"})["poster"] == new["poster"]
+    assert bot.update_facets(new, {**new, "title": "Renamed"}) == set()
+
+
+def test_genres_page_shows_the_filled_poster(bot, drama):
+    client = bot.app.test_client()
+    assert "drama.jpg" not in client.get("/genres").get_data(as_text=True)
+    new = {**drama, "poster": "https://img/drama.jpg"}
+    bot.movies.update_one({"_id": drama["_id"]}, {"$set": {"poster": new["poster"]}})
+    bot.catalog_changed(drama, new)
+    assert "drama.jpg" in client.get("/genres").get_data(as_text=True)
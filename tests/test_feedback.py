@@ -0,0 +1,28 @@
+def test_forwarded_for_is_not_trusted_by_default(bot, monkeypatch):
+    monkeypatch.setattr(bot, "FEEDBACK_RATE_LIMIT", 2)
+    client = bot.app.test_client()
+    form = {"type": "General Feedback", "content_title": "x", "message": "m"}
+    codes = [client.post("/contact", data=form, headers={"X-Forwarded-For": f"9.9.9.{i}"}, environ_base={"REMOTE_ADDR": "1.1.1.1"}).status_code for i in range(3)]
+    assert codes == [200, 200, 429]
+    bot.flush_feedback()
+
+
+def test_partly_written_batch_is_not_requeued_forever(bot, monkeypatch):
+    bot.flush_feedback()
+    bot.feedback.delete_many({})
+    insert_many = bot.feedback.insert_many
+
+    def drop_connection(documents, ordered=True):
+        insert_many(documents[:3], ordered=ordered)
+        for document in documents[3:]: document.setdefault("_id", bot.ObjectId())
+        raise bot.PyMongoError("connection reset")
+
+    monkeypatch.setattr(bot.feedback, "insert_many", drop_connection)
+    for i in range(5): bot.submit_feedback({"message": f"m{i}"})
+    bot.flush_feedback()
+    assert bot.feedback_buffer.qsize() == 5
+    monkeypatch.setattr(bot.feedback, "insert_many", insert_many)
+    bot.submit_feedback({"message": "new"})
+    bot.flush_feedback()
+    assert bot.feedback_buffer.qsize() == 0
+    assert sorted(doc["message"] for doc in bot.feedback.find()) == ["m0", "m1", "m2", "m3", "m4", "new"]
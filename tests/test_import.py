@@ -0,0 +1,42 @@
+import io
+import pytest
+
+
+@pytest.fixture
+def catalog(bot):
+    bot.movies.delete_many({})
+    bot.movies.insert_many([
+        {"title": "Dune", "type": "movie", "is_trending": True, "is_coming_soon": False, "poster": "https://img/dune.jpg", "overview": "Spice.",
+         "release_date": "2021-10-22", "poster_badge": "", "genres": ["Sci-Fi", "Drama"], "watch_link": "https://w/dune",
+         "links": [{"quality": "720p", "url": "https://w/dune-720"}]},
+        {"title": "Dark", "type": "series", "is_trending": False, "is_coming_soon": False, "poster": "https://img/dark.jpg", "overview": "Time.",
+         "release_date": "2017-12-01", "poster_badge": "HD", "genres": ["Mystery"],
+         "episodes": [{"episode_number": 1, "title": "Secrets", "watch_link": "https://w/dark-1", "links": [{"quality": "480p", "url": "https://w/dark-1-480"}]}]},
+    ])
+    yield bot.movies
+    bot.movies.delete_many({})
+
+
+def import_text(bot, text, fmt):
+    return bot.import_catalog(io.StringIO(text), fmt, reload=lambda: None)
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_export_then_import_round_trips(bot, catalog, fmt):
+    before = {doc["title"]: doc for doc in catalog.find()}
+    exported = "".join(bot.export_catalog(fmt))
+    assert import_text(bot, exported, fmt)["updated"] == 0
+    assert {doc["title"]: doc for doc in catalog.find()} == before
+    catalog.delete_many({})
+    summary = import_text(bot, exported, fmt)
+    assert (summary["inserted"], summary["failed"]) == (2, 0)
+    assert {doc["title"]: doc for doc in catalog.find()} == before
+
+
+def test_partial_columns_only_update_those_fields(bot, catalog):
+    before = catalog.find_one({"title": "Dune"})
+    summary = import_text(bot, "title,type,poster_badge\nDune,movie,4K\nArrival,movie,HD\n", "csv")
+    assert (summary["updated"], summary["inserted"]) == (1, 1)
+    assert catalog.find_one({"title": "Dune"}) == {**before, "poster_badge": "4K"}
+    arrival = catalog.find_one({"title": "Arrival"})
+    assert arrival["poster_badge"] == "HD" and arrival["links"] == [] and arrival["is_trending"] is False
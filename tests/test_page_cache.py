@@ -0,0 +1,38 @@
+import pytest
+
+
+@pytest.fixture
+def client(bot):
+    bot.clear_page_cache()
+    bot.movies.insert_many([{"title": f"Movie {i}", "type": "movie", "poster": "", "poster_badge": ""} for i in range(3)])
+    yield bot.app.test_client()
+    bot.movies.delete_many({})
+    bot.clear_page_cache()
+
+
+def test_unused_parameters_share_one_cache_entry(bot, client):
+    for url in ("/movies_only", "/movies_only?x=1", "/movies_only?x=2&utm_source=a", "/movies_only?limit=24", "/movies_only?limit=abc", "/movies_only?page=0"):
+        assert client.get(url).status_code == 200
+    assert len(bot.page_cache) == 1
+
+
+def test_read_parameters_get_their_own_entries(bot, client):
+    for url in ("/movies_only", "/movies_only?limit=2", "/movies_only?limit=500", "/movies_only?limit=100"):
+        client.get(url)
+    assert len(bot.page_cache) == 3
+
+
+def test_api_next_link_only_carries_known_parameters(bot, client):
+    body = client.get("/api/v1/lists/movies?limit=1&x=evil&fields=title").get_json()
+    assert "x=evil" not in body["next"] and "fields=title" in body["next"]
+
+
+def test_suggest_sees_edits_from_other_workers(bot, client, monkeypatch):
+    monkeypatch.setattr(bot, "CATALOG_VERSION_TTL", 0)
+    before = {item["title"] for item in client.get("/api/suggest?q=movie").get_json()["results"]}
+    assert "Movie 1" in before
+    # অন্য worker: ডাটাবেসে লেখা ও ভার্শন বাম্প, এই প্রসেসের title_index জানে না
+    bot.movies.update_one({"title": "Movie 1"}, {"$set": {"title": "Renamed"}})
+    bot.meta.update_one({"_id": "catalog"}, {"$inc": {"version": 1}})
+    after = {item["title"] for item in client.get("/api/suggest?q=movie").get_json()["results"]}
+    assert "Movie 1" not in after
@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.fixture
+def broken_poster(bot, tmdb_stub, stub_server, monkeypatch, tmp_path):
+    monkeypatch.setattr(bot, "IMAGE_CACHE_DIR", str(tmp_path))
+    tmdb_stub["status"] = 500
+    movie_id = bot.movies.insert_one({"title": "poster", "type": "movie", "poster": f"{stub_server}/broken.jpg"}).inserted_id
+    yield str(movie_id)
+    bot.movies.delete_one({"_id": movie_id})
+
+
+def test_origin_failures_are_remembered(bot, tmdb_stub, broken_poster, stub_server):
+    client = bot.app.test_client()
+    first = client.get(f"/img/{broken_poster}/w342")
+    assert first.status_code == 302 and first.location == f"{stub_server}/broken.jpg"
+    for size in ("w342", "w185"):
+        again = client.get(f"/img/{broken_poster}/{size}")
+        assert again.status_code == 302 and "poster-placeholder" in again.location
+    assert len(tmdb_stub["hits"]) == 1
+
+
+def test_origin_is_retried_after_the_failure_ttl(bot, tmdb_stub, broken_poster, monkeypatch):
+    client = bot.app.test_client()
+    client.get(f"/img/{broken_poster}/w342")
+    monkeypatch.setattr(bot, "IMAGE_FAILURE_TTL", 0)
+    client.get(f"/img/{broken_poster}/w342")
+    assert len(tmdb_stub["hits"]) == 2
+
+
+def test_srcset_is_only_offered_when_posters_are_resized(bot, monkeypatch):
+    movie = {"_id": bot.ObjectId(), "poster": "https://img/p.jpg"}
+    with bot.app.test_request_context("/"):
+        assert "185w" in bot.poster_srcset(movie) and "500w" in bot.poster_srcset(movie)
+        monkeypatch.setattr(bot, "Image", None)
+        assert bot.poster_srcset(movie) == ""
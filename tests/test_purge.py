@@ -0,0 +1,50 @@
+import threading
+import time
+
+
+def test_flush_purges_sends_everything_queued(bot, monkeypatch):
+    sent, started = [], threading.Event()
+
+    def slow_send(keys):
+        started.set()
+        time.sleep(0.2)
+        sent.extend(keys)
+
+    monkeypatch.setattr(bot, "PURGE_URL", "http://purge.invalid/")
+    monkeypatch.setattr(bot, "send_purge", slow_send)
+    bot.purge_pages({"movie:1"})
+    started.wait(1)
+    bot.purge_pages({"genre:Action", "all"})
+    bot.flush_purges()
+    assert sorted(sent) == ["all", "genre:Action", "movie:1"]
+    assert bot.purge_queue.unfinished_tasks == 0
+
+
+def test_purge_request_format(bot, purge_stub):
+    bot.purge_pages({"genre:Science Fiction", "badge:4K"})
+    bot.purge_pages({"all"})
+    bot.flush_purges()
+    keys = {key for path, headers in purge_stub["requests"] for key in headers["Surrogate-Key"].split(" ")}
+    assert keys == {"all", "badge:4K", "genre:Science%20Fiction"}
+    assert all(path == "/purge" and headers["Authorization"] == "Bearer secret" for path, headers in purge_stub["requests"])
+
+
+def test_purge_retries_server_errors(bot, purge_stub):
+    purge_stub["statuses"] = [503, 502, 200]
+    bot.send_purge(["all"])
+    assert len(purge_stub["requests"]) == 3
+
+
+def test_purge_gives_up_without_a_final_sleep(bot, purge_stub, monkeypatch):
+    purge_stub["statuses"] = [500]
+    sleeps = []
+    monkeypatch.setattr(bot.time, "sleep", sleeps.append)
+    bot.send_purge(["all"])
+    assert len(purge_stub["requests"]) == bot.PURGE_ATTEMPTS
+    assert sleeps == [0.05, 0.1]
+
+
+def test_client_errors_are_not_retried(bot, purge_stub):
+    purge_stub["statuses"] = [403]
+    bot.send_purge(["all"])
+    assert len(purge_stub["requests"]) == 1
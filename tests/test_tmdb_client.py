@@ -0,0 +1,68 @@
+import time
+import pytest
+import requests
+
+
+def test_consecutive_errors_open_the_breaker(bot, tmdb_stub):
+    tmdb_stub["status"] = 500
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError): bot.tmdb_get("movie/1")
+    with pytest.raises(bot.TmdbUnavailable): bot.tmdb_get("movie/1")
+    assert len(tmdb_stub["hits"]) == 3
+    assert bot.tmdb_breaker.status()["state"] == "open"
+
+
+def test_slow_calls_count_as_failures(bot, tmdb_stub):
+    tmdb_stub["delay"] = 0.6
+    for i in range(3): bot.tmdb_get(f"movie/{i}")
+    assert bot.tmdb_breaker.status()["state"] == "open"
+    assert "slow call" in bot.tmdb_breaker.status()["last_error"]
+
+
+def test_half_open_probe_closes_the_breaker(bot, tmdb_stub):
+    tmdb_stub["status"] = 500
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError): bot.tmdb_get("movie/1")
+    time.sleep(0.35)
+    tmdb_stub["status"] = 200
+    assert bot.tmdb_get("movie/1")["id"] == 42
+    assert bot.tmdb_breaker.status()["state"] == "closed"
+
+
+def test_failed_probe_reopens_the_breaker(bot, tmdb_stub):
+    tmdb_stub["status"] = 500
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError): bot.tmdb_get("movie/1")
+    time.sleep(0.35)
+    with pytest.raises(requests.HTTPError): bot.tmdb_get("movie/1")
+    assert bot.tmdb_breaker.status()["state"] == "open"
+    with pytest.raises(bot.TmdbUnavailable): bot.tmdb_get("movie/1")
+    assert len(tmdb_stub["hits"]) == 4
+
+
+def test_late_success_does_not_close_an_open_breaker(bot):
+    breaker = bot.CircuitBreaker(failure_threshold=1, slow_call_seconds=10, reset_timeout=60)
+    assert breaker.allow()
+    breaker.record_failure("HTTP 500")
+    breaker.record_success(0.1) # এই কলটি ব্রেকার খোলার আগে শুরু হয়েছিল
+    assert breaker.status()["state"] == "open"
+    assert not breaker.allow()
+
+
+def test_retry_after_pauses_and_retries(bot, tmdb_stub):
+    tmdb_stub["retry_after"] = 1
+    started = time.monotonic()
+    assert bot.tmdb_get("movie/7")["id"] == 42
+    assert time.monotonic() - started >= 1
+    assert len(tmdb_stub["hits"]) == 2
+    assert bot.tmdb_breaker.status()["state"] == "closed"
+
+
+def test_cached_responses_survive_an_open_breaker(bot, tmdb_stub):
+    assert bot.tmdb_get("movie/9")["id"] == 42
+    tmdb_stub["status"] = 500
+    for i in range(3):
+        with pytest.raises(requests.HTTPError): bot.tmdb_get(f"movie/{100 + i}")
+    bot.tmdb_memory_cache.clear() # Mongo tmdb_cache থেকেই আসবে
+    assert bot.tmdb_get("movie/9")["id"] == 42
+    assert len(tmdb_stub["hits"]) == 4